@@ -11,8 +11,11 @@ Main entry point that integrates:
 """
 
 import asyncio
+import atexit
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
 from dotenv import load_dotenv
 
@@ -35,11 +38,23 @@ from state_graph import create_hotel_agent, AgentState
 # Load environment variables
 load_dotenv()
 
-# Configure logging
+# Configure logging: handlers only enqueue records, a background thread does the I/O
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
+# The queue side only merges args into the message; the full format is applied
+# once, on the listener thread (basicConfig would otherwise add its own)
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
 logging.basicConfig(
     level=os.getenv('LOG_LEVEL', 'INFO'),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    handlers=[_queue_handler]
 )
+_log_listener = QueueListener(_log_queue, _log_handler, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 
@@ -74,6 +89,7 @@ class HotelVoiceAgent:
             'check_out_date': None,
             'guest_count': None,
             'available_rooms': None,
+            'room_lookup': None,
             'selected_room_id': None,
             'selected_room_name': None,
             'guest_name': None,
@@ -82,6 +98,9 @@ class HotelVoiceAgent:
             'special_requests': None,
             'booking_status': None,
             'confirmation_number': None,
+            'history_summary': None,
+            'history_summarized_count': 0,
+            'last_human_idx': None,
             'current_step': None,
             'needs_dates': True,
             'needs_guest_info': True,
@@ -94,7 +113,7 @@ class HotelVoiceAgent:
     async def run(self):
         """Main entry point for the voice agent."""
 
-        logger.info(f"Starting hotel voice agent for room: {self.ctx.room.name}")
+        logger.info("Starting hotel voice agent for room: %s", self.ctx.room.name)
 
         # Check if this is a phone/SIP call
         is_phone_call = self.ctx.room.name.startswith("call-")
@@ -102,9 +121,13 @@ class HotelVoiceAgent:
         # Connect to room
         await self.ctx.connect(auto_subscribe=AutoSubscribe.AUDIO_ONLY)
 
+        # Prime the PMS connection pool while waiting for the caller
+        warmup_task = asyncio.create_task(self.pms_client.warmup())
+
         # Wait for participant to join
         participant = await self.ctx.wait_for_participant()
-        logger.info(f"Participant joined: {participant.identity}")
+        await warmup_task
+        logger.info("Participant joined: %s", participant.identity)
 
         # Create the voice pipeline agent
         agent = VoicePipelineAgent(
@@ -146,13 +169,13 @@ class HotelVoiceAgent:
         @agent.on("user_speech_committed")
         def on_user_speech(msg: str):
             """Handle user speech input."""
-            logger.info(f"User said: {msg}")
+            logger.info("User said: %s", msg)
             asyncio.create_task(self._handle_user_input(msg, agent))
 
         @agent.on("agent_speech_committed")
         def on_agent_speech(msg: str):
             """Handle agent speech output."""
-            logger.info(f"Agent said: {msg}")
+            logger.info("Agent said: %s", msg)
 
         @agent.on("agent_started_speaking")
         def on_started_speaking():
@@ -174,7 +197,7 @@ class HotelVoiceAgent:
             f"When would you like to check in?"
         )
 
-        logger.info(f"Sending initial greeting: {greeting}")
+        logger.info("Sending initial greeting: %s", greeting)
 
         # Add to state
         greeting_msg = AIMessage(content=greeting)
@@ -191,9 +214,8 @@ class HotelVoiceAgent:
 
         try:
             # Add user message to state
-            self.agent_state['messages'] = self.agent_state['messages'] + [
-                HumanMessage(content=user_input)
-            ]
+            self.agent_state['messages'].append(HumanMessage(content=user_input))
+            self.agent_state['last_human_idx'] = len(self.agent_state['messages']) - 1
 
             # Run the state graph
             result = await self.hotel_agent.app.ainvoke(self.agent_state)
@@ -214,7 +236,7 @@ class HotelVoiceAgent:
                 await agent.say(last_ai_message, allow_interruptions=True)
 
         except Exception as e:
-            logger.error(f"Error handling user input: {e}", exc_info=True)
+            logger.error("Error handling user input: %s", e, exc_info=True)
 
             # Send error response
             error_msg = (
@@ -271,9 +293,11 @@ class HotelVoiceAgent:
 
                 try:
                     # Add to state
-                    self.parent.agent_state['messages'] = (
-                        self.parent.agent_state['messages'] +
-                        [HumanMessage(content=user_message)]
+                    self.parent.agent_state['messages'].append(
+                        HumanMessage(content=user_message)
+                    )
+                    self.parent.agent_state['last_human_idx'] = (
+                        len(self.parent.agent_state['messages']) - 1
                     )
 
                     # Run state graph
@@ -303,7 +327,7 @@ class HotelVoiceAgent:
                     )
 
                 except Exception as e:
-                    logger.error(f"Error in LLM adapter: {e}", exc_info=True)
+                    logger.error("Error in LLM adapter: %s", e, exc_info=True)
                     return llm.ChatResponse(
                         choices=[
                             llm.Choice(
@@ -330,7 +354,7 @@ async def entrypoint(ctx: JobContext):
     This function is called for each new room/session.
     """
 
-    logger.info(f"Entrypoint called for room: {ctx.room.name}")
+    logger.info("Entrypoint called for room: %s", ctx.room.name)
 
     # Create and run the agent
     agent = HotelVoiceAgent(ctx)
@@ -357,13 +381,13 @@ def main():
     missing_vars = [var for var in required_vars if not os.getenv(var)]
 
     if missing_vars:
-        logger.error(f"Missing required environment variables: {', '.join(missing_vars)}")
+        logger.error("Missing required environment variables: %s", ', '.join(missing_vars))
         logger.error("Please check your .env file")
         return
 
     logger.info("Starting Hotel Voice Agent Worker")
-    logger.info(f"Hotel: {os.getenv('HOTEL_NAME', 'The Grand Hotel')}")
-    logger.info(f"LiveKit URL: {os.getenv('LIVEKIT_URL')}")
+    logger.info("Hotel: %s", os.getenv('HOTEL_NAME', 'The Grand Hotel'))
+    logger.info("LiveKit URL: %s", os.getenv('LIVEKIT_URL'))
 
     # Run the LiveKit worker
     cli.run_app(
@@ -6,15 +6,95 @@ Handles room availability checks and booking creation.
 """
 
 import os
+import asyncio
 import logging
+import operator
 from datetime import datetime, date
 from typing import Dict, List, Optional, Any
 import httpx
+import orjson
 from pydantic import BaseModel, Field, validator
 
+try:
+    import rusty_req
+except ImportError:  # Optional: Rust-backed transport, see PMS_HTTP_TRANSPORT
+    rusty_req = None
+
+try:
+    import numba
+except ImportError:  # Optional: date arithmetic falls back to pure Python
+    numba = None
+
 logger = logging.getLogger(__name__)
 
 
+def _days_between_py(y1: int, m1: int, d1: int, y2: int, m2: int, d2: int) -> int:
+    """Days from (y1, m1, d1) to (y2, m2, d2) using Rata Die day numbers."""
+    if m1 < 3:
+        y1 -= 1
+        m1 += 12
+    if m2 < 3:
+        y2 -= 1
+        m2 += 12
+    rd1 = 365 * y1 + y1 // 4 - y1 // 100 + y1 // 400 + (153 * m1 - 457) // 5 + d1
+    rd2 = 365 * y2 + y2 // 4 - y2 // 100 + y2 // 400 + (153 * m2 - 457) // 5 + d2
+    return rd2 - rd1
+
+
+if numba is not None:
+    _days_between = numba.njit(cache=True)(_days_between_py)
+    _days_between(2024, 1, 1, 2024, 1, 2)  # Compile (or load from cache) at import
+else:
+    _days_between = _days_between_py
+
+
+def nights_between(check_in: str, check_out: str) -> int:
+    """
+    Number of nights between two already-validated YYYY-MM-DD dates.
+
+    Meant for batch checks over many candidate date ranges, where the
+    JIT-compiled day count pays off. It uses a plain ASCII slice parse, so
+    callers must validate the format first; single lookups should use
+    date.fromisoformat instead.
+    """
+    return _days_between(
+        int(check_in[:4]), int(check_in[5:7]), int(check_in[8:10]),
+        int(check_out[:4]), int(check_out[5:7]), int(check_out[8:10])
+    )
+
+
+# Mock inventory: (id, name, description, price in cents, max guests, amenities, available)
+_MOCK_ROOMS_CENTS = (
+    (
+        'room_101',
+        'Standard Room',
+        'Comfortable room with queen bed, city view',
+        15000,
+        2,
+        ('WiFi', 'TV', 'Air Conditioning', 'Coffee Maker'),
+        5
+    ),
+    (
+        'room_201',
+        'Deluxe Suite',
+        'Spacious suite with king bed, ocean view, separate living area',
+        25000,
+        3,
+        ('WiFi', 'TV', 'Mini Bar', 'Balcony', 'Jacuzzi'),
+        3
+    ),
+    (
+        'room_301',
+        'Presidential Suite',
+        'Luxurious suite with panoramic views, private terrace',
+        50000,
+        4,
+        ('WiFi', 'TV', 'Mini Bar', 'Private Terrace', 'Butler Service'),
+        1
+    ),
+)
+
+
 class RoomType(BaseModel):
     """Represents a room type available in the hotel."""
 
@@ -48,6 +128,171 @@ class BookingDetails(BaseModel):
             raise ValueError('Date must be in YYYY-MM-DD format')
 
 
+# ============================================================================
+# HTTP Transports
+# ============================================================================
+
+class HttpxTransport:
+    """Default transport backed by a pooled httpx.AsyncClient."""
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Dict[str, str],
+        timeout: int,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
+        self.base_url = base_url
+        self.headers = headers
+        self.timeout = timeout
+
+        # Client shared with other services; owned (and closed) by the caller
+        self._shared_client = http_client
+
+        # Own connection pool, created lazily on the running event loop
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client bound to the current event loop."""
+        if self._shared_client is not None:
+            return self._shared_client
+
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+            self._client_loop = loop
+        return self._client
+
+    async def _request(self, method: str, path: str, **kwargs) -> Any:
+        response = await self._get_client().request(
+            method,
+            f"{self.base_url}{path}",
+            headers=self.headers,
+            timeout=self.timeout,
+            **kwargs
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content) if response.content else None
+
+    async def head(self, path: str = ''):
+        await self._get_client().head(
+            f"{self.base_url}{path}",
+            headers=self.headers,
+            timeout=self.timeout
+        )
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        return await self._request('GET', path, params=params)
+
+    async def post(
+        self,
+        path: str,
+        json: Dict[str, Any],
+        params: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        # Encoded with orjson; the client headers already declare application/json
+        return await self._request('POST', path, content=orjson.dumps(json), params=params)
+
+    async def delete(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        return await self._request('DELETE', path, params=params)
+
+    async def get_many(self, requests: List[tuple]) -> List[Any]:
+        """Issue several GETs concurrently; `requests` is a list of (path, params)."""
+        return list(await asyncio.gather(*(self.get(path, params) for path, params in requests)))
+
+    async def aclose(self):
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+
+
+class RustyReqTransport:
+    """
+    Optional transport backed by the Rust `rusty-req` client.
+
+    Enabled with PMS_HTTP_TRANSPORT=rusty_req. Errors are raised as
+    httpx.HTTPError so callers handle both transports the same way.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Dict[str, str],
+        timeout: int,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
+        if rusty_req is None:
+            raise ImportError("rusty-req is not installed")
+
+        self.base_url = base_url
+        self.headers = headers
+        self.timeout = timeout
+
+    @staticmethod
+    def _parse(result: Dict[str, Any]) -> Any:
+        exception = result.get('exception') or {}
+        if exception.get('type'):
+            raise httpx.HTTPError(f"{exception['type']}: {exception.get('message')}")
+
+        status = result.get('http_status', 0)
+        if status >= 400:
+            raise httpx.HTTPError(f"HTTP {status} from PMS")
+
+        content = (result.get('response') or {}).get('content')
+        return orjson.loads(content) if content else None
+
+    def _request_kwargs(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        return {
+            'url': f"{self.base_url}{path}",
+            'method': method,
+            'headers': self.headers,
+            'timeout': self.timeout,
+            **{k: v for k, v in kwargs.items() if v is not None}
+        }
+
+    async def _request(self, method: str, path: str, **kwargs) -> Any:
+        result = await rusty_req.fetch_single(**self._request_kwargs(method, path, **kwargs))
+        return self._parse(result)
+
+    async def head(self, path: str = ''):
+        await rusty_req.fetch_single(**self._request_kwargs('HEAD', path))
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        return await self._request('GET', path, params=params)
+
+    async def post(
+        self,
+        path: str,
+        json: Dict[str, Any],
+        params: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        return await self._request('POST', path, params=params, json=json)
+
+    async def delete(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        return await self._request('DELETE', path, params=params)
+
+    async def get_many(self, requests: List[tuple]) -> List[Any]:
+        """Issue several GETs as one rusty-req batch; `requests` is a list of (path, params)."""
+        results = await rusty_req.fetch_requests(
+            [self._request_kwargs('GET', path, params=params) for path, params in requests],
+            concurrency_mode='SELECT_ALL',
+            total_timeout=self.timeout
+        )
+        return [self._parse(result) for result in results]
+
+    async def aclose(self):
+        """rusty-req manages its own connection pool."""
+
+
+_TRANSPORTS = {
+    'httpx': HttpxTransport,
+    'rusty_req': RustyReqTransport,
+}
+
+
 class QloAppsClient:
     """
     Client for interacting with QloApps Property Management System.
@@ -67,7 +312,8 @@ class QloAppsClient:
         base_url: Optional[str] = None,
         api_key: Optional[str] = None,
         timeout: int = 30,
-        mock_mode: bool = True
+        mock_mode: bool = True,
+        http_client: Optional[httpx.AsyncClient] = None
     ):
         """
         Initialize the QloApps client.
@@ -77,6 +323,7 @@ class QloAppsClient:
             api_key: Webservice authentication key
             timeout: Request timeout in seconds
             mock_mode: If True, return mock data instead of making real API calls
+            http_client: Optional shared httpx.AsyncClient (httpx transport only)
         """
         self.base_url = base_url or os.getenv('QLOAPPS_BASE_URL', 'http://localhost/api')
         self.api_key = api_key or os.getenv('QLOAPPS_API_KEY', 'mock_key')
@@ -89,11 +336,60 @@ class QloAppsClient:
             'Accept': 'application/json'
         }
 
+        # Constant part of the booking payload; create_booking fills in the rest
+        self._booking_template = {
+            'booking': {
+                'id_customer': 'new',
+                'total_rooms': 1
+            }
+        }
+
+        # HTTP transport for the real API (httpx unless PMS_HTTP_TRANSPORT says otherwise)
+        transport_name = os.getenv('PMS_HTTP_TRANSPORT', 'httpx')
+        if transport_name not in _TRANSPORTS:
+            raise ValueError(
+                f"Unknown PMS_HTTP_TRANSPORT {transport_name!r}; "
+                f"expected one of: {', '.join(_TRANSPORTS)}"
+            )
+        self._transport = _TRANSPORTS[transport_name](
+            self.base_url,
+            self.headers,
+            self.timeout,
+            http_client=http_client
+        )
+
         logger.info(
-            f"QloApps client initialized - Base URL: {self.base_url}, "
-            f"Mock Mode: {self.mock_mode}"
+            "QloApps client initialized - Base URL: %s, Mock Mode: %s, Transport: %s",
+            self.base_url, self.mock_mode, transport_name
         )
 
+    async def aclose(self):
+        """Release the transport's pooled connections."""
+        await self._transport.aclose()
+
+    async def warmup(self, connections: int = 3):
+        """
+        Prime the connection pool before the first user turn.
+
+        Fires a few HEAD requests in parallel so TCP/TLS handshakes are
+        paid up front instead of on the first availability check.
+
+        Args:
+            connections: Number of parallel connections to open (2-4 is plenty)
+        """
+        if self.mock_mode:
+            return
+
+        async def _ping():
+            try:
+                await self._transport.head()
+            except httpx.HTTPError as e:
+                logger.warning("PMS warmup request failed: %s", e)
+
+        await asyncio.gather(*(_ping() for _ in range(connections)))
+
+        logger.info("PMS connection pool warmed with %d connections", connections)
+
     async def check_availability(
         self,
         check_in: str,
@@ -132,46 +428,73 @@ class QloAppsClient:
 
         try:
             # Real API implementation
-            params = {
-                'date_from': check_in,
-                'date_to': check_out,
-                'occupancy': guests,
-                'ws_key': self.api_key,
-                'output_format': 'JSON'
-            }
+            data = await self._transport.get(
+                '/rooms',
+                self._availability_params(check_in, check_out, guests)
+            )
+            rooms = self._parse_rooms(data)
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/rooms",
-                    params=params,
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                # Transform QloApps response to standard format
-                rooms = []
-                for room in data.get('rooms', []):
-                    rooms.append({
-                        'id': str(room.get('id')),
-                        'name': room.get('name', 'Unknown Room'),
-                        'description': room.get('description', ''),
-                        'price_per_night': float(room.get('price', 0)),
-                        'max_guests': int(room.get('max_guests', 2)),
-                        'amenities': room.get('amenities', []),
-                        'available_count': int(room.get('available', 0))
-                    })
-
-                logger.info(f"Found {len(rooms)} available rooms for {check_in} to {check_out}")
-                return rooms
+            logger.info("Found %d available rooms for %s to %s", len(rooms), check_in, check_out)
+            return rooms
 
         except httpx.HTTPError as e:
-            logger.error(f"HTTP error checking availability: {e}")
+            logger.error("HTTP error checking availability: %s", e)
             raise
         except Exception as e:
-            logger.error(f"Error checking availability: {e}")
+            logger.error("Error checking availability: %s", e)
             raise
 
+    async def check_availability_many(
+        self,
+        queries: List[Dict[str, Any]]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Check availability for several date ranges concurrently.
+
+        Args:
+            queries: List of dicts with check_in, check_out and guests keys
+
+        Returns:
+            One list of available rooms per query, in the same order
+        """
+        if self.mock_mode:
+            return [
+                self._mock_check_availability(q['check_in'], q['check_out'], q['guests'])
+                for q in queries
+            ]
+
+        datas = await self._transport.get_many([
+            ('/rooms', self._availability_params(q['check_in'], q['check_out'], q['guests']))
+            for q in queries
+        ])
+        return [self._parse_rooms(data) for data in datas]
+
+    def _availability_params(self, check_in: str, check_out: str, guests: int) -> Dict[str, Any]:
+        """Build query parameters for the rooms endpoint."""
+        return {
+            'date_from': check_in,
+            'date_to': check_out,
+            'occupancy': guests,
+            'ws_key': self.api_key,
+            'output_format': 'JSON'
+        }
+
+    @staticmethod
+    def _parse_rooms(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Transform QloApps response to standard format."""
+        rooms = []
+        for room in (data or {}).get('rooms', []):
+            rooms.append({
+                'id': str(room.get('id')),
+                'name': room.get('name', 'Unknown Room'),
+                'description': room.get('description', ''),
+                'price_per_night': float(room.get('price', 0)),
+                'max_guests': int(room.get('max_guests', 2)),
+                'amenities': room.get('amenities', []),
+                'available_count': int(room.get('available', 0))
+            })
+        return rooms
+
     def _mock_check_availability(
         self,
         check_in: str,
@@ -180,53 +503,30 @@ class QloAppsClient:
     ) -> List[Dict[str, Any]]:
         """Return mock room availability data."""
 
-        # Calculate number of nights
-        check_in_date = datetime.strptime(check_in, '%Y-%m-%d')
-        check_out_date = datetime.strptime(check_out, '%Y-%m-%d')
-        nights = (check_out_date - check_in_date).days
-
-        mock_rooms = [
-            {
-                'id': 'room_101',
-                'name': 'Standard Room',
-                'description': 'Comfortable room with queen bed, city view',
-                'price_per_night': 150.00,
-                'total_price': 150.00 * nights,
-                'max_guests': 2,
-                'amenities': ['WiFi', 'TV', 'Air Conditioning', 'Coffee Maker'],
-                'available_count': 5
-            },
-            {
-                'id': 'room_201',
-                'name': 'Deluxe Suite',
-                'description': 'Spacious suite with king bed, ocean view, separate living area',
-                'price_per_night': 250.00,
-                'total_price': 250.00 * nights,
-                'max_guests': 3,
-                'amenities': ['WiFi', 'TV', 'Mini Bar', 'Balcony', 'Jacuzzi'],
-                'available_count': 3
-            },
-            {
-                'id': 'room_301',
-                'name': 'Presidential Suite',
-                'description': 'Luxurious suite with panoramic views, private terrace',
-                'price_per_night': 500.00,
-                'total_price': 500.00 * nights,
-                'max_guests': 4,
-                'amenities': ['WiFi', 'TV', 'Mini Bar', 'Private Terrace', 'Butler Service'],
-                'available_count': 1
-            }
-        ]
+        # Calculate number of nights (fromisoformat also rejects malformed dates)
+        nights = (date.fromisoformat(check_out) - date.fromisoformat(check_in)).days
 
         # Filter rooms based on guest count
+        ge = operator.ge
         available_rooms = [
-            room for room in mock_rooms
-            if room['max_guests'] >= guests and room['available_count'] > 0
+            {
+                'id': room_id,
+                'name': name,
+                'description': description,
+                'price_per_night': price_cents / 100,
+                'total_price': price_cents * nights / 100,
+                'max_guests': max_guests,
+                'amenities': list(amenities),
+                'available_count': available_count
+            }
+            for room_id, name, description, price_cents, max_guests, amenities, available_count
+            in _MOCK_ROOMS_CENTS
+            if ge(max_guests, guests) and available_count > 0
         ]
 
         logger.info(
-            f"Mock: Found {len(available_rooms)} rooms for {guests} guests "
-            f"from {check_in} to {check_out}"
+            "Mock: Found %d rooms for %s guests from %s to %s",
+            len(available_rooms), guests, check_in, check_out
         )
 
         return available_rooms
@@ -281,7 +581,7 @@ class QloAppsClient:
         try:
             booking = BookingDetails(**guest_details)
         except Exception as e:
-            logger.error(f"Invalid booking details: {e}")
+            logger.error("Invalid booking details: %s", e)
             raise ValueError(f"Invalid booking details: {e}")
 
         if self.mock_mode:
@@ -296,44 +596,39 @@ class QloAppsClient:
             # Prepare booking payload for QloApps
             payload = {
                 'booking': {
+                    **self._booking_template['booking'],
                     'id_room': room_id,
                     'date_from': booking.check_in,
                     'date_to': booking.check_out,
-                    'id_customer': 'new',
                     'customer': {
                         'firstname': first_name,
                         'lastname': last_name,
                         'email': booking.guest_email,
                         'phone': booking.guest_phone
                     },
-                    'total_rooms': 1,
                     'occupancy': booking.guest_count,
                     'comment': booking.special_requests or ''
                 }
             }
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/bookings",
-                    json=payload,
-                    headers=self.headers,
-                    params={'ws_key': self.api_key}
-                )
-                response.raise_for_status()
-                data = response.json()
+            data = await self._transport.post(
+                '/bookings',
+                json=payload,
+                params={'ws_key': self.api_key}
+            )
 
-                # Extract confirmation number from response
-                booking_data = data.get('booking', {})
-                confirmation_number = booking_data.get('confirmation_number') or booking_data.get('id')
+            # Extract confirmation number from response
+            booking_data = (data or {}).get('booking', {})
+            confirmation_number = booking_data.get('confirmation_number') or booking_data.get('id')
 
-                logger.info(f"Booking created successfully: {confirmation_number}")
-                return confirmation_number
+            logger.info("Booking created successfully: %s", confirmation_number)
+            return confirmation_number
 
         except httpx.HTTPError as e:
-            logger.error(f"HTTP error creating booking: {e}")
+            logger.error("HTTP error creating booking: %s", e)
             raise
         except Exception as e:
-            logger.error(f"Error creating booking: {e}")
+            logger.error("Error creating booking: %s", e)
             raise
 
     def _mock_create_booking(
@@ -349,8 +644,8 @@ class QloAppsClient:
         confirmation_number = f"CONF-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
 
         logger.info(
-            f"Mock booking created: {confirmation_number} for "
-            f"{guest_details.get('guest_name')} in room {room_id}"
+            "Mock booking created: %s for %s in room %s",
+            confirmation_number, guest_details.get('guest_name'), room_id
         )
 
         return confirmation_number
@@ -376,17 +671,13 @@ class QloAppsClient:
             }
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/bookings/{confirmation_number}",
-                    headers=self.headers,
-                    params={'ws_key': self.api_key}
-                )
-                response.raise_for_status()
-                return response.json()
+            return await self._transport.get(
+                f"/bookings/{confirmation_number}",
+                params={'ws_key': self.api_key}
+            )
 
         except Exception as e:
-            logger.error(f"Error retrieving booking: {e}")
+            logger.error("Error retrieving booking: %s", e)
             raise
 
     async def cancel_booking(self, confirmation_number: str) -> bool:
@@ -400,19 +691,16 @@ class QloAppsClient:
             True if cancellation successful
         """
         if self.mock_mode:
-            logger.info(f"Mock: Booking {confirmation_number} cancelled")
+            logger.info("Mock: Booking %s cancelled", confirmation_number)
             return True
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.delete(
-                    f"{self.base_url}/bookings/{confirmation_number}",
-                    headers=self.headers,
-                    params={'ws_key': self.api_key}
-                )
-                response.raise_for_status()
-                return True
+            await self._transport.delete(
+                f"/bookings/{confirmation_number}",
+                params={'ws_key': self.api_key}
+            )
+            return True
 
         except Exception as e:
-            logger.error(f"Error cancelling booking: {e}")
+            logger.error("Error cancelling booking: %s", e)
             raise
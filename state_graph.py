@@ -15,21 +15,58 @@ Defines the conversation flow as a finite state machine:
 
 import os
 import re
+import time
+import uuid
+import asyncio
+import hashlib
 import logging
-from datetime import datetime, timedelta
-from typing import TypedDict, Annotated, Sequence, Optional, List, Dict, Any
-from operator import add
+from functools import lru_cache
+from datetime import date
+from typing import TypedDict, Annotated, Sequence, Optional, List, Dict, Any, Union
 
+import httpx
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
 from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
 from langgraph.graph import StateGraph, END
+from langgraph.graph.message import add_messages
+from langgraph.types import Send
 from pydantic import BaseModel, Field
 
 from pms_client import QloAppsClient
 
+try:
+    import hyperscan
+except ImportError:  # Optional: falls back to precompiled `re` patterns
+    hyperscan = None
+
+try:
+    from fastembed import TextEmbedding
+except ImportError:  # Optional: semantic tier of ResponseCache
+    TextEmbedding = None
+
 logger = logging.getLogger(__name__)
 
+# Only the most recent messages are sent verbatim; older ones are summarized
+HISTORY_WINDOW = 8
+HISTORY_SUMMARY_THRESHOLD = 16
+
+# Steps whose responses carry per-user room lists or bookings and must not be cached
+UNCACHEABLE_STEPS = {"presenting_options", "completed"}
+
+# Availability results are kept per conversation (in the session, so every
+# worker sees the same copy) and reused for repeat queries within this window
+AVAILABILITY_CACHE_TTL_SECONDS = 60
+AVAILABILITY_CACHE_MAX_ENTRIES = 16
+
+# End of the first sentence in a streamed reply (terminator followed by whitespace)
+_SENTENCE_END_RE = re.compile(r"[.!?](?=\s)")
+
+# Cheap hint that a message may carry contact details: an email "@", an
+# international "+" prefix or a 10-digit phone number (dates never match)
+_CONTACT_HINT_RE = re.compile(r"@|\+\d|\d{3}[\s.-]?\d{3}[\s.-]?\d{4}")
+
 
 # ============================================================================
 # State Schema
@@ -42,7 +79,7 @@ class AgentState(TypedDict):
     Tracks the conversation history and all collected information
     throughout the booking process.
     """
-    messages: Annotated[Sequence[BaseMessage], add]
+    messages: Annotated[List[BaseMessage], add_messages]
 
     # Date information
     check_in_date: Optional[str]  # YYYY-MM-DD format
@@ -51,6 +88,8 @@ class AgentState(TypedDict):
 
     # Room selection
     available_rooms: Optional[List[Dict[str, Any]]]
+    availability_cache: Optional[Dict[str, Any]]  # See _cache_availability
+    room_lookup: Optional[Dict[str, Dict[str, Any]]]  # See build_room_lookup
     selected_room_id: Optional[str]
     selected_room_name: Optional[str]
 
@@ -64,6 +103,11 @@ class AgentState(TypedDict):
     booking_status: Optional[str]  # pending, confirmed, failed
     confirmation_number: Optional[str]
 
+    # Conversation memory: summary of messages that fell out of the LLM window
+    history_summary: Optional[str]
+    history_summarized_count: int  # Leading messages already folded into the summary
+    last_human_idx: Optional[int]  # Index of the latest HumanMessage in messages
+
     # Flow control
     current_step: Optional[str]
     needs_dates: bool
@@ -71,10 +115,135 @@ class AgentState(TypedDict):
     ready_to_book: bool
 
 
+def last_human_message(state: AgentState) -> str:
+    """
+    Return the text of the latest user message.
+
+    Uses last_human_idx when it points at a HumanMessage and falls back to
+    scanning backwards (e.g. for sessions saved before the index existed).
+    """
+    messages = state["messages"]
+    idx = state.get("last_human_idx")
+    if idx is not None and 0 <= idx < len(messages) and isinstance(messages[idx], HumanMessage):
+        return messages[idx].content
+
+    for msg in reversed(messages):
+        if isinstance(msg, HumanMessage):
+            return msg.content
+    return ""
+
+
 # ============================================================================
 # Date Extraction and Validation
 # ============================================================================
 
+_MONTHS = 'jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec'
+_MONTH_NUMBERS = {name: number for number, name in enumerate(_MONTHS.split('|'), 1)}
+_ORDINAL = r'(?:st|nd|rd|th)?'
+# Full or abbreviated month names only, so words like "junior", "separate" or
+# "decent" are never read as months
+_MONTH_NAMES = (
+    r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?'
+    r'|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b'
+)
+
+# Date formats, in match priority order (names double as regex group names)
+_DATE_PATTERNS = {
+    'iso': r'\d{4}-\d{2}-\d{2}',
+    'slash': r'\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b',
+    'dot': r'\b\d{1,2}\.\d{1,2}\.\d{2,4}\b',
+    'natural': (
+        rf'\b(?:\d{{1,2}}{_ORDINAL}\s+(?:of\s+)?{_MONTH_NAMES}\.?(?:,?\s*\d{{4}})?'
+        rf'|{_MONTH_NAMES}\.?\s+\d{{1,2}}{_ORDINAL}\b(?:,?\s*\d{{4}})?)'
+    ),
+}
+_DATE_KINDS = tuple(_DATE_PATTERNS)
+
+_GUEST_COUNT_PATTERNS = (
+    r'(\d+)\s*(?:guests?|people|persons?)',
+    r'for\s*(\d+)',
+    r'party\s*of\s*(\d+)'
+)
+
+# One alternation scanned once per message; m.lastgroup names the format
+_DATE_RE = re.compile(
+    '|'.join(f'(?P<{kind}>{pattern})' for kind, pattern in _DATE_PATTERNS.items()),
+    re.IGNORECASE
+)
+_GUEST_COUNT_RES = tuple(re.compile(p) for p in _GUEST_COUNT_PATTERNS)
+_DIGITS_RE = re.compile(r'\d+')
+_MONTH_RE = re.compile(_MONTHS, re.IGNORECASE)
+
+# Hyperscan pattern ids: date formats first, then guest-count patterns in priority order
+_HS_GUEST_ID_START = len(_DATE_KINDS)
+
+
+def _compile_hyperscan_db():
+    """Compile all extraction patterns into a single Hyperscan database."""
+    patterns = tuple(_DATE_PATTERNS.values()) + _GUEST_COUNT_PATTERNS
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[p.encode() for p in patterns],
+        ids=list(range(len(patterns))),
+        elements=len(patterns),
+        flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(patterns)
+    )
+    return db
+
+
+_HS_DB = _compile_hyperscan_db() if hyperscan is not None else None
+
+
+def _hs_scan(text: str) -> List[tuple]:
+    """Scan text once against every pattern, returning (id, start, end, match) tuples."""
+    data = text.lower().encode()
+    matches = []
+
+    def on_match(pattern_id, start, end, flags, context):
+        matches.append((pattern_id, start, end, data[start:end].decode()))
+
+    _HS_DB.scan(data, match_event_handler=on_match)
+    return matches
+
+
+def _to_iso_date(kind: str, text: str) -> Optional[str]:
+    """Normalize a matched date of the given format to YYYY-MM-DD."""
+    if kind == 'iso':
+        return text
+
+    numbers = [int(n) for n in _DIGITS_RE.findall(text)]
+    year = None
+
+    if kind == 'slash':
+        month, day = numbers[0], numbers[1]
+        if len(numbers) > 2:
+            year = numbers[2]
+    elif kind == 'dot':
+        day, month, year = numbers
+    else:
+        month = _MONTH_NUMBERS[_MONTH_RE.search(text).group(0).lower()]
+        day = numbers[0]
+        if len(numbers) > 1:
+            year = numbers[1]
+
+    if year is not None and year < 100:
+        year += 2000
+
+    try:
+        if year is None:
+            # No year given: the next occurrence of that day
+            today = date.today()
+            parsed = date(today.year, month, day)
+            if parsed < today:
+                parsed = date(today.year + 1, month, day)
+        else:
+            parsed = date(year, month, day)
+    except ValueError:
+        return None
+
+    return parsed.isoformat()
+
+
 class DateExtractor:
     """Extract and parse dates from natural language."""
 
@@ -84,19 +253,33 @@ class DateExtractor:
         Extract check-in and check-out dates from text.
 
         Supports formats like:
-        - "December 1st to December 5th"
-        - "12/1 to 12/5"
-        - "from Jan 1 to Jan 5"
-        - "next Monday for 3 nights"
+        - "2024-12-01 to 2024-12-05"
+        - "December 1st to December 5th" / "1 Dec 2024"
+        - "12/1 to 12/5" (month/day, optional year)
+        - "01.12.2024" (day.month.year)
         """
         result = {
             'check_in': None,
             'check_out': None
         }
 
-        # Simple date patterns (YYYY-MM-DD)
-        date_pattern = r'(\d{4}-\d{2}-\d{2})'
-        dates = re.findall(date_pattern, text)
+        if _HS_DB is not None:
+            # Keep leftmost-longest, non-overlapping matches, like finditer
+            hits = sorted(
+                (start, -end, pid, match)
+                for pid, start, end, match in _hs_scan(text)
+                if pid < _HS_GUEST_ID_START
+            )
+            found = []
+            last_end = -1
+            for start, neg_end, pid, match in hits:
+                if start >= last_end:
+                    found.append((_DATE_KINDS[pid], match))
+                    last_end = -neg_end
+        else:
+            found = [(m.lastgroup, m.group(0)) for m in _DATE_RE.finditer(text)]
+
+        dates = [iso for iso in (_to_iso_date(kind, match) for kind, match in found) if iso]
 
         if len(dates) >= 2:
             result['check_in'] = dates[0]
@@ -107,20 +290,31 @@ class DateExtractor:
     @staticmethod
     def extract_guest_count(text: str) -> Optional[int]:
         """Extract number of guests from text."""
-        patterns = [
-            r'(\d+)\s*(?:guests?|people|persons?)',
-            r'for\s*(\d+)',
-            r'party\s*of\s*(\d+)'
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text.lower())
+        if _HS_DB is not None:
+            # Earliest pattern wins, then earliest position, then the longest
+            # (greedy) match - same result as the re loop below
+            hits = [
+                (pid, start, -end, match)
+                for pid, start, end, match in _hs_scan(text)
+                if pid >= _HS_GUEST_ID_START
+            ]
+            if hits:
+                return int(_DIGITS_RE.search(min(hits)[3]).group(0))
+            return None
+
+        text_lower = text.lower()
+        for pattern in _GUEST_COUNT_RES:
+            match = pattern.search(text_lower)
             if match:
                 return int(match.group(1))
 
         return None
 
 
+# Cached (monotonic timestamp, today) pair; refreshed at most once a minute
+_today_cache: tuple[float, date] = (0.0, date.min)
+
+
 def validate_dates(check_in: str, check_out: str) -> tuple[bool, Optional[str]]:
     """
     Validate that dates are logical and not in the past.
@@ -132,28 +326,412 @@ def validate_dates(check_in: str, check_out: str) -> tuple[bool, Optional[str]]:
     Returns:
         Tuple of (is_valid, error_message)
     """
+    global _today_cache
+
     try:
-        check_in_date = datetime.strptime(check_in, '%Y-%m-%d').date()
-        check_out_date = datetime.strptime(check_out, '%Y-%m-%d').date()
-        today = datetime.now().date()
+        check_in_date = date.fromisoformat(check_in)
+        check_out_date = date.fromisoformat(check_out)
+    except ValueError:
+        return False, "Invalid date format. Please use YYYY-MM-DD format."
+
+    now = time.monotonic()
+    if now - _today_cache[0] > 60:
+        _today_cache = (now, date.today())
+    today = _today_cache[1]
+
+    # Nights as an ordinal difference avoids building a timedelta
+    nights = check_out_date.toordinal() - check_in_date.toordinal()
+
+    if check_in_date < today:
+        error = "Check-in date cannot be in the past."
+    elif nights <= 0:
+        error = "Check-out date must be after check-in date."
+    elif nights > 30:
+        # Check if stay is reasonable (not more than 30 days)
+        error = "Maximum stay is 30 nights. Please select a shorter period."
+    else:
+        error = None
 
-        # Check if dates are in the past
-        if check_in_date < today:
-            return False, "Check-in date cannot be in the past."
+    return (error is None, error)
 
-        # Check if check-out is after check-in
-        if check_out_date <= check_in_date:
-            return False, "Check-out date must be after check-in date."
 
-        # Check if stay is reasonable (not more than 30 days)
-        nights = (check_out_date - check_in_date).days
-        if nights > 30:
-            return False, "Maximum stay is 30 nights. Please select a shorter period."
+# ============================================================================
+# Guest Information Extraction
+# ============================================================================
+
+class GuestInfo(BaseModel):
+    """Guest details extracted from the conversation."""
+
+    name: Optional[str] = Field(None, description="Guest's full name")
+    email: Optional[str] = Field(None, description="Guest's email address")
+    phone: Optional[str] = Field(None, description="Guest's phone number")
+    requests: Optional[str] = Field(None, description="Special requests, if any")
+
+
+_GUEST_INFO_LINE_RE = re.compile(r"^\s*(Name|Email|Phone|Requests):\s*(.+?)\s*$", re.M)
+
+
+def parse_guest_info(content: str) -> GuestInfo:
+    """Parse the plain-text "Field: value" extraction format into GuestInfo."""
+    fields = {}
+    for label, value in _GUEST_INFO_LINE_RE.findall(content):
+        if "NONE" not in value:
+            fields.setdefault(label.lower(), value)
+    return GuestInfo(**fields)
+
+
+# ============================================================================
+# Room Selection
+# ============================================================================
+
+_ROOM_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+# Longest room name (in words) tried when matching user text against the lookup
+ROOM_NAME_MAX_WORDS = 4
+
+# A list position only counts as a room choice when it is the whole message
+# ("2", "#2.") or directly follows room/option/number/# ("option 2", "room #1");
+# bare digits elsewhere are dates, guest counts or nights
+_ROOM_ORDINAL_RE = re.compile(
+    r"^\s*#?\s*(\d+)\s*[.!)]?\s*$|(?:\b(?:room|option|number)\s*#?|#)\s*(\d+)\b",
+    re.IGNORECASE
+)
+
+
+def build_room_lookup(rooms: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Index rooms by normalized name, id and 1-based position in the list.
+
+    Positions are keyed as "#1", "#2", ... so they never collide with words
+    from the message; match_room only looks them up for explicit ordinals.
+
+    Args:
+        rooms: Rooms as returned by the PMS availability check
+
+    Returns:
+        Mapping of lookup key to room
+    """
+    lookup = {f"#{i + 1}": room for i, room in enumerate(rooms)}
+    lookup.update({room["id"].lower(): room for room in rooms})
+    lookup.update({
+        " ".join(_ROOM_TOKEN_RE.findall(room["name"].lower())): room
+        for room in rooms
+    })
+    return lookup
+
+
+def match_room(lookup: Dict[str, Dict[str, Any]], text: str) -> Optional[Dict[str, Any]]:
+    """
+    Find the room referenced in user text with dict lookups over word n-grams.
+
+    Longer n-grams are tried first; names and ids win over list positions,
+    which are only accepted in the explicit forms of _ROOM_ORDINAL_RE.
+    """
+    tokens = _ROOM_TOKEN_RE.findall(text.lower())
+    for size in range(min(ROOM_NAME_MAX_WORDS, len(tokens)), 0, -1):
+        for start in range(len(tokens) - size + 1):
+            room = lookup.get(" ".join(tokens[start:start + size]))
+            if room is not None:
+                return room
+
+    ordinal = _ROOM_ORDINAL_RE.search(text)
+    if ordinal:
+        return lookup.get(f"#{ordinal.group(1) or ordinal.group(2)}")
+    return None
+
+
+# ============================================================================
+# LLM Call Batching
+# ============================================================================
+
+class BatchingChatGroq:
+    """
+    Coalesce concurrent LLM calls into short batches.
+
+    Calls are queued and a background task collects up to `max_batch` of
+    them every `window` seconds, firing each batch with asyncio.gather.
+    Groq has no batch endpoint, but this keeps bursts of webhook turns on a
+    few warm HTTP connections instead of each call racing on its own.
+    """
+
+    def __init__(self, llm: ChatGroq, max_batch: int = 8, window: float = 0.02):
+        self.llm = llm
+        self.max_batch = max_batch
+        self.window = window
+
+        # Queue and drain task are created lazily on the running event loop
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._drain_task: Optional[asyncio.Task] = None
+        self._batch_tasks: set = set()
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop or self._drain_task.done():
+            self._queue = asyncio.Queue()
+            self._loop = loop
+            self._drain_task = loop.create_task(self._drain())
+        return self._queue
+
+    async def ainvoke(self, input: Any, runnable: Optional[Runnable] = None) -> Any:
+        """Queue a call to `runnable` (the wrapped LLM by default) and await its result."""
+        queue = self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((runnable or self.llm, input, future))
+        return await future
+
+    def wrap(self, runnable: Runnable) -> Runnable:
+        """Return a Runnable that routes `runnable` calls through the batcher."""
+        async def _call(input: Any) -> Any:
+            return await self.ainvoke(input, runnable)
+
+        return RunnableLambda(_call)
+
+    async def _drain(self):
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(self.window)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            # Don't wait for this batch before collecting the next one
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    @staticmethod
+    async def _run_batch(batch: List[tuple]):
+        results = await asyncio.gather(
+            *(runnable.ainvoke(input) for runnable, input, _ in batch),
+            return_exceptions=True
+        )
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+# ============================================================================
+# Response Cache
+# ============================================================================
+
+class ResponseCache:
+    """
+    Two-tier cache for chatbot LLM responses, stored in Redis.
+
+    L1 is an exact match on a SHA-256 of the system prompt and the last few
+    messages. L2 (optional, needs fastembed and RediSearch) embeds the last
+    user message and runs a KNN query restricted to the same system prompt,
+    returning the cached answer when cosine similarity clears the threshold.
+
+    The Redis client is synchronous, so get/set run every round trip (and the
+    embedding) in a worker thread instead of blocking the event loop.
+    """
+
+    L1_PREFIX = "chatbot_response:"
+    L2_PREFIX = "chatbot_response_vec:"
+    L2_INDEX = "chatbot_response_idx"
+    EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_DIM = 384
+
+    def __init__(
+        self,
+        redis_client,
+        ttl: int,
+        similarity_threshold: float = 0.95,
+        history_size: int = 4
+    ):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.history_size = history_size
+
+        self._embedder = None
+        self._semantic_enabled = TextEmbedding is not None and self._create_index()
+
+    def _create_index(self) -> bool:
+        """Create the RediSearch HNSW index; disables L2 if RediSearch is missing."""
+        from redis.commands.search.field import TagField, TextField, VectorField
+        from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+
+        try:
+            self.redis.ft(self.L2_INDEX).info()
+            return True
+        except Exception:
+            pass
+
+        try:
+            self.redis.ft(self.L2_INDEX).create_index(
+                (
+                    TagField("prompt"),
+                    TextField("response"),
+                    VectorField("embedding", "HNSW", {
+                        "TYPE": "FLOAT32",
+                        "DIM": self.EMBEDDING_DIM,
+                        "DISTANCE_METRIC": "COSINE"
+                    })
+                ),
+                definition=IndexDefinition(prefix=[self.L2_PREFIX], index_type=IndexType.HASH)
+            )
+            return True
+        except Exception as e:
+            logger.warning("Semantic response cache disabled: %s", e)
+            return False
+
+    def _l1_key(self, system_prompt: str, messages: Sequence[BaseMessage]) -> str:
+        recent = tuple(msg.content for msg in messages[-self.history_size:])
+        digest = hashlib.sha256(repr((system_prompt, recent)).encode()).hexdigest()
+        return f"{self.L1_PREFIX}{digest}"
+
+    @staticmethod
+    def _prompt_tag(system_prompt: str) -> str:
+        return hashlib.sha256(system_prompt.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _last_human_text(messages: Sequence[BaseMessage]) -> Optional[str]:
+        for msg in reversed(messages):
+            if isinstance(msg, HumanMessage):
+                return msg.content
+        return None
+
+    def _embed(self, text: str) -> bytes:
+        if self._embedder is None:
+            self._embedder = TextEmbedding(self.EMBEDDING_MODEL)
+        return next(iter(self._embedder.embed([text]))).astype("float32").tobytes()
+
+    def _lookup(
+        self,
+        system_prompt: str,
+        messages: Sequence[BaseMessage]
+    ) -> Optional[AIMessage]:
+        cached = self.redis.get(self._l1_key(system_prompt, messages))
+        if cached is not None:
+            return AIMessage(content=cached)
+
+        text = self._last_human_text(messages)
+        if not self._semantic_enabled or not text:
+            return None
+
+        from redis.commands.search.query import Query
+
+        query = (
+            Query(f"(@prompt:{{{self._prompt_tag(system_prompt)}}})=>[KNN 1 @embedding $vec AS score]")
+            .return_fields("response", "score")
+            .dialect(2)
+        )
+        result = self.redis.ft(self.L2_INDEX).search(query, query_params={"vec": self._embed(text)})
+        if result.docs and 1 - float(result.docs[0].score) >= self.similarity_threshold:
+            return AIMessage(content=result.docs[0].response)
+        return None
+
+    def _store(
+        self,
+        system_prompt: str,
+        messages: Sequence[BaseMessage],
+        response: BaseMessage
+    ):
+        self.redis.setex(self._l1_key(system_prompt, messages), self.ttl, response.content)
+
+        text = self._last_human_text(messages)
+        if not self._semantic_enabled or not text:
+            return
+
+        key = f"{self.L2_PREFIX}{uuid.uuid4().hex}"
+        self.redis.hset(key, mapping={
+            "prompt": self._prompt_tag(system_prompt),
+            "response": response.content,
+            "embedding": self._embed(text)
+        })
+        self.redis.expire(key, self.ttl)
+
+    async def get(
+        self,
+        system_prompt: str,
+        messages: Sequence[BaseMessage]
+    ) -> Optional[AIMessage]:
+        """Return a cached response for this prompt and history, if any."""
+        try:
+            return await asyncio.to_thread(self._lookup, system_prompt, messages)
+        except Exception as e:
+            logger.warning("Response cache lookup failed: %s", e)
+        return None
+
+    async def set(
+        self,
+        system_prompt: str,
+        messages: Sequence[BaseMessage],
+        response: BaseMessage
+    ):
+        """Store a response under both cache tiers."""
+        try:
+            await asyncio.to_thread(self._store, system_prompt, messages, response)
+        except Exception as e:
+            logger.warning("Response cache store failed: %s", e)
+
+
+# ============================================================================
+# System Prompt
+# ============================================================================
+
+@lru_cache(maxsize=512)
+def _system_prompt_cached(
+    hotel_name: str,
+    check_in: Optional[str],
+    check_out: Optional[str],
+    guests: Optional[int],
+    room_name: Optional[str],
+    history_summary: Optional[str],
+    current_step: Optional[str],
+    needs_dates: bool,
+    needs_guest_info: bool,
+    has_selected_room: bool
+) -> str:
+    """
+    Render the chatbot system prompt from the state fields it depends on.
+
+    Cached so repeat turns reuse the same string, which also keeps the
+    prompt prefix byte-identical for Groq's prompt caching.
+    """
+    base_prompt = f"""You are a polite and professional hotel receptionist at {hotel_name}.
+
+Your role is to help guests make room reservations through natural conversation.
+
+Guidelines:
+1. Be warm, friendly, and professional
+2. Speak naturally - you're having a voice conversation
+3. Keep responses concise (1-3 sentences)
+4. If asked about topics unrelated to hotel reservations, politely redirect to booking
+5. Always confirm important details with the guest
+
+Current conversation context:"""
+
+    # Add current state context
+    if check_in:
+        base_prompt += f"\n- Check-in: {check_in}"
+    if check_out:
+        base_prompt += f"\n- Check-out: {check_out}"
+    if guests:
+        base_prompt += f"\n- Guests: {guests}"
+    if room_name:
+        base_prompt += f"\n- Selected room: {room_name}"
 
-        return True, None
+    if history_summary:
+        base_prompt += f"\n\nPrior context:\n{history_summary}"
 
-    except ValueError as e:
-        return False, f"Invalid date format. Please use YYYY-MM-DD format."
+    # Add next action guidance
+    if needs_dates:
+        base_prompt += "\n\nNext: Ask for check-in date, check-out date, and number of guests."
+    elif current_step == "presenting_options":
+        base_prompt += "\n\nNext: The available rooms have been presented. Ask which room they prefer."
+    elif has_selected_room and needs_guest_info:
+        base_prompt += "\n\nNext: Collect guest name, email, and phone number for the booking."
+    elif current_step == "completed":
+        base_prompt += "\n\nThe booking is complete. Ask if they need anything else."
+
+    return base_prompt
 
 
 # ============================================================================
@@ -163,18 +741,53 @@ def validate_dates(check_in: str, check_out: str) -> tuple[bool, Optional[str]]:
 class HotelAgentGraph:
     """Hotel reservation agent state machine using LangGraph."""
 
-    def __init__(self, pms_client: QloAppsClient, hotel_name: str = "The Grand Hotel"):
+    def __init__(
+        self,
+        pms_client: QloAppsClient,
+        hotel_name: str = "The Grand Hotel",
+        response_cache: Optional[ResponseCache] = None,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
         self.pms_client = pms_client
         self.hotel_name = hotel_name
+        self.response_cache = response_cache
 
         # Initialize Groq LLM (Llama 3.1 70B)
         self.llm = ChatGroq(
             model="llama-3.1-70b-versatile",
             temperature=0.7,
             api_key=os.getenv('GROQ_API_KEY'),
-            streaming=True
+            streaming=True,
+            http_async_client=http_client
+        )
+
+        # Cheaper model for rolling conversation summaries
+        self.summary_llm = ChatGroq(
+            model="llama-3.1-8b-instant",
+            temperature=0,
+            api_key=os.getenv('GROQ_API_KEY'),
+            http_async_client=http_client
         )
 
+        # Stateless helpers are created once and reused every turn
+        self._date_extractor = DateExtractor()
+
+        # Concurrent chatbot/extraction calls are coalesced into short batches
+        self._batcher = BatchingChatGroq(self.llm)
+
+        # Chat chain is built once; the system prompt is passed in per turn
+        self._prompt = ChatPromptTemplate.from_messages([
+            ("system", "{system_prompt}"),
+            MessagesPlaceholder(variable_name="messages")
+        ])
+        self._chain = self._prompt | self._batcher.wrap(self.llm)
+
+        # Unbatched variant used when the caller wants the reply streamed
+        self._stream_chain = self._prompt | self.llm
+
+        # Guest details come back as a GuestInfo instance via Groq tool calling
+        self._guest_info_llm = self._batcher.wrap(self.llm.with_structured_output(GuestInfo))
+
         # Build the graph
         self.graph = self._build_graph()
         self.app = self.graph.compile()
@@ -252,107 +865,159 @@ class HotelAgentGraph:
     # Node Implementations
     # ========================================================================
 
-    async def chatbot_node(self, state: AgentState) -> AgentState:
+    async def chatbot_node(self, state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
         """
         Main conversational node using Llama 3.1 70B.
 
         Generates responses based on the current state and guides
-        the conversation towards completing a booking.
+        the conversation towards completing a booking. If the caller sets
+        an async `on_first_sentence` callback in config["configurable"],
+        the final reply of the run is streamed and the callback gets its
+        first sentence as soon as it is complete. With the current routing
+        only a pass that ends the run (a completed booking) is final; passes
+        that route on to another node are never streamed.
         """
+        on_first_sentence = (config or {}).get("configurable", {}).get("on_first_sentence")
+
+        # Fold messages that left the window into the rolling summary
+        summary_updates = await self._update_history_summary(state)
+        state = {**state, **summary_updates}
+
+        # The graph can loop back here several times per message; only the pass
+        # that ends the run produces the reply the user gets, so earlier passes
+        # must not push their first sentence
+        if on_first_sentence is not None and not self._ends_run(state):
+            on_first_sentence = None
+        window = self._trim_messages(state["messages"])
+
         # Build system prompt based on current state
         system_prompt = self._build_system_prompt(state)
 
-        # Create chat prompt
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            MessagesPlaceholder(variable_name="messages")
-        ])
-
-        # Generate response
-        chain = prompt | self.llm
+        # Once a room is chosen or guest details are in, replies are about this
+        # guest's booking and must never be served to anyone else
+        cacheable = (
+            self.response_cache is not None and
+            state.get("current_step") not in UNCACHEABLE_STEPS and
+            not state.get("selected_room_id") and
+            state.get("needs_guest_info", True)
+        )
 
         try:
-            response = await chain.ainvoke({"messages": state["messages"]})
+            response = None
+            if cacheable:
+                response = await self.response_cache.get(system_prompt, state["messages"])
+
+            if response is None:
+                chain_input = {"system_prompt": system_prompt, "messages": window}
+                if on_first_sentence is not None:
+                    response = await self._stream_response(chain_input, on_first_sentence)
+                else:
+                    response = await self._chain.ainvoke(chain_input)
+                if cacheable:
+                    await self.response_cache.set(system_prompt, state["messages"], response)
 
             return {
-                **state,
+                **summary_updates,
                 "messages": [response]
             }
         except Exception as e:
-            logger.error(f"Error in chatbot node: {e}")
+            logger.error("Error in chatbot node: %s", e)
             error_message = AIMessage(
                 content="I apologize, I'm experiencing technical difficulties. "
                        "Could you please repeat that?"
             )
             return {
-                **state,
+                **summary_updates,
                 "messages": [error_message]
             }
 
-    async def extract_info_node(self, state: AgentState) -> AgentState:
+    async def _stream_response(self, chain_input: Dict[str, Any], on_first_sentence) -> AIMessage:
+        """Stream a chatbot reply, handing the first complete sentence to the callback."""
+        buf = []
+        send_task = None
+
+        async for chunk in self._stream_chain.astream(chain_input):
+            buf.append(chunk.content)
+            if send_task is None:
+                text = "".join(buf)
+                match = _SENTENCE_END_RE.search(text)
+                if match:
+                    send_task = asyncio.create_task(on_first_sentence(text[:match.end()]))
+
+        # Make sure the first sentence is out before the rest of the reply
+        if send_task is not None:
+            try:
+                await send_task
+            except Exception as e:
+                logger.warning("Failed to send first sentence: %s", e)
+
+        return AIMessage(content="".join(buf))
+
+    async def extract_info_node(self, state: AgentState) -> Dict[str, Any]:
         """Extract dates and guest count from the conversation."""
+        # Regex extraction is CPU-bound; keep it off the event loop
+        return await asyncio.to_thread(self._extract_info, state)
 
-        # Get the last user message
-        last_message = ""
-        for msg in reversed(state["messages"]):
-            if isinstance(msg, HumanMessage):
-                last_message = msg.content
-                break
+    def _extract_info(self, state: AgentState) -> Dict[str, Any]:
+        """Return the date/guest-count updates found in the last user message."""
 
-        extractor = DateExtractor()
+        last_message = last_human_message(state)
+
+        extractor = self._date_extractor
+        updates = {}
 
         # Extract dates if not already collected
         if not state.get("check_in_date") or not state.get("check_out_date"):
             dates = extractor.extract_dates(last_message)
             if dates["check_in"]:
-                state["check_in_date"] = dates["check_in"]
+                updates["check_in_date"] = dates["check_in"]
             if dates["check_out"]:
-                state["check_out_date"] = dates["check_out"]
+                updates["check_out_date"] = dates["check_out"]
 
         # Extract guest count if not already collected
         if not state.get("guest_count"):
             guest_count = extractor.extract_guest_count(last_message)
             if guest_count:
-                state["guest_count"] = guest_count
+                updates["guest_count"] = guest_count
 
         # Update needs_dates flag
+        merged = {**state, **updates}
         has_all_dates = (
-            state.get("check_in_date") and
-            state.get("check_out_date") and
-            state.get("guest_count")
+            merged.get("check_in_date") and
+            merged.get("check_out_date") and
+            merged.get("guest_count")
         )
-        state["needs_dates"] = not has_all_dates
+        updates["needs_dates"] = not has_all_dates
 
-        return state
+        return updates
 
-    async def validate_dates_node(self, state: AgentState) -> AgentState:
+    async def validate_dates_node(self, state: AgentState) -> Dict[str, Any]:
         """Validate the collected dates."""
 
         check_in = state.get("check_in_date")
         check_out = state.get("check_out_date")
 
         if not check_in or not check_out:
-            state["current_step"] = "needs_dates"
-            return state
+            return {"current_step": "needs_dates"}
 
         is_valid, error_msg = validate_dates(check_in, check_out)
 
-        if not is_valid:
-            # Add error message to conversation
-            error_response = AIMessage(
-                content=f"I'm sorry, but there's an issue with those dates: {error_msg} "
-                       "Could you please provide different dates?"
-            )
-            state["messages"] = state["messages"] + [error_response]
-            state["check_in_date"] = None
-            state["check_out_date"] = None
-            state["current_step"] = "invalid_dates"
-        else:
-            state["current_step"] = "dates_valid"
+        if is_valid:
+            return {"current_step": "dates_valid"}
 
-        return state
+        # Add error message to conversation
+        error_response = AIMessage(
+            content=f"I'm sorry, but there's an issue with those dates: {error_msg} "
+                   "Could you please provide different dates?"
+        )
+        return {
+            "messages": [error_response],
+            "check_in_date": None,
+            "check_out_date": None,
+            "current_step": "invalid_dates"
+        }
 
-    async def check_availability_node(self, state: AgentState) -> AgentState:
+    async def check_availability_node(self, state: AgentState) -> Dict[str, Any]:
         """Check room availability via PMS."""
 
         check_in = state["check_in_date"]
@@ -360,14 +1025,28 @@ class HotelAgentGraph:
         guests = state["guest_count"]
 
         try:
-            available_rooms = await self.pms_client.check_availability(
-                check_in=check_in,
-                check_out=check_out,
-                guests=guests
-            )
+            cache = state.get("availability_cache") or {}
+            cache_key = f"{check_in}|{check_out}|{guests}"
+            available_rooms = self._get_cached_availability(cache, cache_key)
+            fetched = available_rooms is None
+            if fetched:
+                available_rooms = await self.pms_client.check_availability(
+                    check_in=check_in,
+                    check_out=check_out,
+                    guests=guests
+                )
+
+            updates = {
+                "available_rooms": available_rooms,
+                "room_lookup": build_room_lookup(available_rooms),
+                "current_step": "presenting_options"
+            }
 
-            state["available_rooms"] = available_rooms
-            state["current_step"] = "presenting_options"
+            # Sold-out answers aren't cached, so rooms that free up show at once
+            if fetched and available_rooms:
+                updates["availability_cache"] = self._cache_availability(
+                    cache, cache_key, available_rooms
+                )
 
             # Generate message presenting options
             if available_rooms:
@@ -384,24 +1063,24 @@ class HotelAgentGraph:
                            f"{guests} guests from {check_in} to {check_out}. "
                            f"Would you like to try different dates?"
                 )
-                state["current_step"] = "no_availability"
+                updates["current_step"] = "no_availability"
 
-            state["messages"] = state["messages"] + [message]
+            updates["messages"] = [message]
+            return updates
 
         except Exception as e:
-            logger.error(f"Error checking availability: {e}")
+            logger.error("Error checking availability: %s", e)
             error_message = AIMessage(
                 content="I'm having trouble checking availability right now. "
                        "Please try again in a moment."
             )
-            state["messages"] = state["messages"] + [error_message]
-            state["current_step"] = "error"
+            return {"messages": [error_message], "current_step": "error"}
 
-        return state
-
-    async def collect_guest_info_node(self, state: AgentState) -> AgentState:
+    async def collect_guest_info_node(self, state: AgentState) -> Dict[str, Any]:
         """Extract guest information from conversation."""
 
+        updates = {}
+
         # Use LLM to extract structured information
         extraction_prompt = """
         Extract guest information from the conversation.
@@ -421,45 +1100,52 @@ class HotelAgentGraph:
             for m in recent_messages
         ])
 
-        try:
-            response = await self.llm.ainvoke([
-                SystemMessage(content=extraction_prompt),
-                HumanMessage(content=conversation)
-            ])
-
-            # Parse response (simple parsing)
-            content = response.content
-            if "Name:" in content and "NONE" not in content.split("Name:")[1].split("\n")[0]:
-                name_line = content.split("Name:")[1].split("\n")[0].strip()
-                if name_line != "NONE":
-                    state["guest_name"] = name_line
-
-            if "Email:" in content and "NONE" not in content.split("Email:")[1].split("\n")[0]:
-                email_line = content.split("Email:")[1].split("\n")[0].strip()
-                if email_line != "NONE":
-                    state["guest_email"] = email_line
+        extraction_messages = [
+            SystemMessage(content=extraction_prompt),
+            HumanMessage(content=conversation)
+        ]
 
-            if "Phone:" in content and "NONE" not in content.split("Phone:")[1].split("\n")[0]:
-                phone_line = content.split("Phone:")[1].split("\n")[0].strip()
-                if phone_line != "NONE":
-                    state["guest_phone"] = phone_line
+        try:
+            try:
+                info = await self._guest_info_llm.ainvoke(extraction_messages)
+            except Exception as e:
+                # Structured output unavailable or malformed; parse the plain-text format
+                logger.warning("Structured guest info extraction failed: %s", e)
+                response = await self._batcher.ainvoke(extraction_messages)
+                info = parse_guest_info(response.content)
+
+            if info.name:
+                updates["guest_name"] = info.name
+            if info.email:
+                updates["guest_email"] = info.email
+            if info.phone:
+                updates["guest_phone"] = info.phone
+            if info.requests:
+                updates["special_requests"] = info.requests
 
             # Check if we have all required info
+            merged = {**state, **updates}
             has_all_info = (
-                state.get("guest_name") and
-                state.get("guest_email") and
-                state.get("guest_phone")
+                merged.get("guest_name") and
+                merged.get("guest_email") and
+                merged.get("guest_phone")
             )
 
-            state["needs_guest_info"] = not has_all_info
-            state["ready_to_book"] = has_all_info
+            updates["needs_guest_info"] = not has_all_info
+            # When run in parallel with date extraction, don't book before dates
+            # exist or a room has been chosen
+            updates["ready_to_book"] = bool(
+                has_all_info and
+                not state.get("needs_dates", True) and
+                state.get("selected_room_id")
+            )
 
         except Exception as e:
-            logger.error(f"Error extracting guest info: {e}")
+            logger.error("Error extracting guest info: %s", e)
 
-        return state
+        return updates
 
-    async def create_booking_node(self, state: AgentState) -> AgentState:
+    async def create_booking_node(self, state: AgentState) -> Dict[str, Any]:
         """Create the booking via PMS."""
 
         guest_details = {
@@ -478,10 +1164,6 @@ class HotelAgentGraph:
                 room_id=state['selected_room_id']
             )
 
-            state["confirmation_number"] = confirmation_number
-            state["booking_status"] = "confirmed"
-            state["current_step"] = "completed"
-
             # Generate confirmation message
             message = AIMessage(
                 content=f"Excellent! Your booking is confirmed.\n\n"
@@ -494,24 +1176,28 @@ class HotelAgentGraph:
                        f"We look forward to welcoming you to {self.hotel_name}!\n\n"
                        f"Is there anything else I can help you with?"
             )
-            state["messages"] = state["messages"] + [message]
+            return {
+                "messages": [message],
+                "confirmation_number": confirmation_number,
+                "booking_status": "confirmed",
+                "current_step": "completed",
+                # The booked room is gone; don't offer it again from cache
+                "availability_cache": None
+            }
 
         except Exception as e:
-            logger.error(f"Error creating booking: {e}")
-            state["booking_status"] = "failed"
+            logger.error("Error creating booking: %s", e)
             error_message = AIMessage(
                 content="I apologize, but I encountered an error while creating your booking. "
                        "Please try again or contact our reservations team directly."
             )
-            state["messages"] = state["messages"] + [error_message]
-
-        return state
+            return {"messages": [error_message], "booking_status": "failed"}
 
     # ========================================================================
     # Routing Functions
     # ========================================================================
 
-    def route_from_chatbot(self, state: AgentState) -> str:
+    def route_from_chatbot(self, state: AgentState) -> Union[str, List[Send]]:
         """Determine next node from chatbot."""
 
         current_step = state.get("current_step", "")
@@ -525,8 +1211,15 @@ class HotelAgentGraph:
                     return "extract_info"
             return "end"
 
-        # If we need dates, extract info
+        # If we need dates, extract info - fanned out alongside guest-info
+        # extraction only when a room is chosen or the message looks like it
+        # carries contact details, since that costs an extra LLM call
         if state.get("needs_dates", True):
+            if state.get("needs_guest_info", True) and (
+                state.get("selected_room_id") or
+                _CONTACT_HINT_RE.search(last_human_message(state))
+            ):
+                return [Send("extract_info", state), Send("collect_guest_info", state)]
             return "extract_info"
 
         # If we have dates but haven't validated, validate
@@ -541,19 +1234,16 @@ class HotelAgentGraph:
         # If we have rooms and user selected one
         if state.get("available_rooms") and current_step == "presenting_options":
             # Check if room was selected in last message
-            last_message = ""
-            for msg in reversed(state["messages"]):
-                if isinstance(msg, HumanMessage):
-                    last_message = msg.content.lower()
-                    break
-
-            # Simple room selection detection
-            for room in state["available_rooms"]:
-                if room["name"].lower() in last_message or room["id"] in last_message:
-                    state["selected_room_id"] = room["id"]
-                    state["selected_room_name"] = room["name"]
-                    state["current_step"] = "room_selected"
-                    return "collect_guest_info"
+            last_message = last_human_message(state)
+
+            # Room selection by name, id or list position
+            room_lookup = state.get("room_lookup") or build_room_lookup(state["available_rooms"])
+            room = match_room(room_lookup, last_message)
+            if room is not None:
+                state["selected_room_id"] = room["id"]
+                state["selected_room_name"] = room["name"]
+                state["current_step"] = "room_selected"
+                return "collect_guest_info"
 
         # If room is selected and we need guest info
         if state.get("selected_room_id") and state.get("needs_guest_info", True):
@@ -565,6 +1255,11 @@ class HotelAgentGraph:
 
         return "continue"
 
+    def _ends_run(self, state: AgentState) -> bool:
+        """Whether route_from_chatbot will end the run after this chatbot pass."""
+        after = {**state, "messages": [*state["messages"], AIMessage(content="")]}
+        return self.route_from_chatbot(after) == "end"
+
     def route_from_validation(self, state: AgentState) -> str:
         """Route from date validation."""
         if state.get("current_step") == "dates_valid":
@@ -589,56 +1284,103 @@ class HotelAgentGraph:
 
     def _build_system_prompt(self, state: AgentState) -> str:
         """Build context-aware system prompt."""
+        return _system_prompt_cached(
+            self.hotel_name,
+            state.get("check_in_date"),
+            state.get("check_out_date"),
+            state.get("guest_count"),
+            state.get("selected_room_name"),
+            state.get("history_summary"),
+            state.get("current_step", ""),
+            state.get("needs_dates", True),
+            state.get("needs_guest_info", True),
+            bool(state.get("selected_room_id"))
+        )
 
-        base_prompt = f"""You are a polite and professional hotel receptionist at {self.hotel_name}.
+    @staticmethod
+    def _trim_messages(messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+        """Return the sliding window of messages sent verbatim to the LLM."""
+        return list(messages[-HISTORY_WINDOW:])
 
-Your role is to help guests make room reservations through natural conversation.
+    async def _update_history_summary(self, state: AgentState) -> Dict[str, Any]:
+        """
+        Summarize messages that fell out of the window once enough accumulate.
 
-Guidelines:
-1. Be warm, friendly, and professional
-2. Speak naturally - you're having a voice conversation
-3. Keep responses concise (1-3 sentences)
-4. If asked about topics unrelated to hotel reservations, politely redirect to booking
-5. Always confirm important details with the guest
+        Returns the state updates (empty when no summary is needed).
+        """
+        messages = state["messages"]
+        summarized = state.get("history_summarized_count") or 0
 
-Current conversation context:"""
+        if len(messages) - summarized <= HISTORY_SUMMARY_THRESHOLD:
+            return {}
 
-        # Add current state context
-        if state.get("check_in_date"):
-            base_prompt += f"\n- Check-in: {state['check_in_date']}"
-        if state.get("check_out_date"):
-            base_prompt += f"\n- Check-out: {state['check_out_date']}"
-        if state.get("guest_count"):
-            base_prompt += f"\n- Guests: {state['guest_count']}"
-        if state.get("selected_room_name"):
-            base_prompt += f"\n- Selected room: {state['selected_room_name']}"
-
-        # Add next action guidance
-        current_step = state.get("current_step", "")
+        cutoff = len(messages) - HISTORY_WINDOW
+        transcript = "\n".join(
+            f"{'User' if isinstance(m, HumanMessage) else 'Agent'}: {m.content}"
+            for m in messages[summarized:cutoff]
+        )
+        previous = state.get("history_summary") or "None"
 
-        if state.get("needs_dates", True):
-            base_prompt += "\n\nNext: Ask for check-in date, check-out date, and number of guests."
-        elif current_step == "presenting_options":
-            base_prompt += "\n\nNext: The available rooms have been presented. Ask which room they prefer."
-        elif state.get("selected_room_id") and state.get("needs_guest_info", True):
-            base_prompt += "\n\nNext: Collect guest name, email, and phone number for the booking."
-        elif current_step == "completed":
-            base_prompt += "\n\nThe booking is complete. Ask if they need anything else."
+        try:
+            response = await self.summary_llm.ainvoke([
+                SystemMessage(content=(
+                    "Summarize this hotel booking conversation in a few short bullet points. "
+                    "Keep dates, guest counts, room choices, guest details and open questions."
+                )),
+                HumanMessage(content=f"Previous summary:\n{previous}\n\nNew messages:\n{transcript}")
+            ])
+        except Exception as e:
+            logger.error("Error summarizing conversation history: %s", e)
+            return {}
 
-        return base_prompt
+        return {
+            "history_summary": response.content,
+            "history_summarized_count": cutoff
+        }
+
+    @staticmethod
+    def _get_cached_availability(
+        cache: Dict[str, Any],
+        key: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Return cached rooms for a "check_in|check_out|guests" key, if fresh."""
+        entry = cache.get(key)
+        if entry is None or time.time() - entry[0] > AVAILABILITY_CACHE_TTL_SECONDS:
+            return None
+        return list(entry[1])
+
+    @staticmethod
+    def _cache_availability(
+        cache: Dict[str, Any],
+        key: str,
+        rooms: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Return a copy of a session's availability cache with rooms stored under key.
+
+        Entries are [timestamp, rooms] lists (msgpack-friendly, and wall-clock
+        time so they stay valid across workers). Expired entries are dropped
+        and the oldest ones evicted beyond AVAILABILITY_CACHE_MAX_ENTRIES.
+        """
+        now = time.time()
+        fresh = {
+            k: entry for k, entry in cache.items()
+            if now - entry[0] <= AVAILABILITY_CACHE_TTL_SECONDS and k != key
+        }
+        fresh[key] = [now, list(rooms)]
+        while len(fresh) > AVAILABILITY_CACHE_MAX_ENTRIES:
+            del fresh[min(fresh, key=lambda k: fresh[k][0])]
+        return fresh
 
     def _format_room_options(self, rooms: List[Dict[str, Any]]) -> str:
         """Format room options for presentation."""
 
-        formatted = []
-        for i, room in enumerate(rooms, 1):
-            formatted.append(
-                f"{i}. {room['name']} - ${room['price_per_night']}/night\n"
-                f"   {room['description']}\n"
-                f"   Amenities: {', '.join(room['amenities'])}"
-            )
-
-        return "\n\n".join(formatted)
+        return "\n\n".join(
+            f"{i}. {room['name']} - ${room['price_per_night']}/night\n"
+            f"   {room['description']}\n"
+            f"   Amenities: {', '.join(room['amenities'])}"
+            for i, room in enumerate(rooms, 1)
+        )
 
 
 # ============================================================================
@@ -647,7 +1389,9 @@ Current conversation context:"""
 
 def create_hotel_agent(
     pms_client: QloAppsClient,
-    hotel_name: str = None
+    hotel_name: str = None,
+    response_cache: Optional[ResponseCache] = None,
+    http_client: Optional[httpx.AsyncClient] = None
 ) -> HotelAgentGraph:
     """
     Create and return a configured hotel agent.
@@ -655,9 +1399,16 @@ def create_hotel_agent(
     Args:
         pms_client: QloApps PMS client instance
         hotel_name: Name of the hotel (defaults to env var)
+        response_cache: Optional cache for chatbot LLM responses
+        http_client: Optional shared httpx.AsyncClient for Groq calls
 
     Returns:
         Configured HotelAgentGraph instance
     """
     hotel_name = hotel_name or os.getenv('HOTEL_NAME', 'The Grand Hotel')
-    return HotelAgentGraph(pms_client=pms_client, hotel_name=hotel_name)
+    return HotelAgentGraph(
+        pms_client=pms_client,
+        hotel_name=hotel_name,
+        response_cache=response_cache,
+        http_client=http_client
+    )
@@ -0,0 +1,315 @@
+"""Tests for state_graph (no Groq, PMS or Redis needed)."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("langgraph")
+pytest.importorskip("langchain_groq")
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+from langchain_core.runnables import RunnableLambda  # noqa: E402
+
+from state_graph import (  # noqa: E402
+    DateExtractor,
+    GuestInfo,
+    HotelAgentGraph,
+    build_room_lookup,
+    match_room,
+)
+
+
+ROOMS = [
+    {"id": "room_101", "name": "Standard Room"},
+    {"id": "room_201", "name": "Deluxe Suite"},
+    {"id": "room_301", "name": "Family Room"},
+]
+
+
+@pytest.fixture
+def lookup():
+    return build_room_lookup(ROOMS)
+
+
+# ============================================================================
+# Room Selection
+# ============================================================================
+
+@pytest.mark.parametrize("text, room_id", [
+    ("I'll take the Deluxe Suite please", "room_201"),
+    ("room_101", "room_101"),
+    ("2", "room_201"),
+    (" #3. ", "room_301"),
+    ("option 2", "room_201"),
+    ("Room #1 please", "room_101"),
+    ("number 3", "room_301"),
+])
+def test_match_room_selects(lookup, text, room_id):
+    assert match_room(lookup, text)["id"] == room_id
+
+
+@pytest.mark.parametrize("text", [
+    "Is breakfast included for 2 people?",
+    "What about 1 more night?",
+    "12/1 to 12/5 for 2 guests",
+    "9",
+])
+def test_match_room_ignores_incidental_numbers(lookup, text):
+    assert match_room(lookup, text) is None
+
+
+# ============================================================================
+# Date Extraction
+# ============================================================================
+
+@pytest.mark.parametrize("text", [
+    "I need 2 junior suites from 12/1 to 12/5",
+    "2 separate rooms 2025-12-01 to 2025-12-05",
+    "2 decent rooms 2025-12-01 to 2025-12-05",
+])
+def test_extract_dates_ignores_month_like_words(text):
+    dates = DateExtractor.extract_dates(text)
+    assert dates["check_in"].endswith("-12-01")
+    assert dates["check_out"].endswith("-12-05")
+
+
+def test_extract_dates_reads_month_names():
+    dates = DateExtractor.extract_dates("Sept 1st to 5 September 2026")
+    assert dates["check_in"].endswith("-09-01")
+    assert dates["check_out"] == "2026-09-05"
+
+
+# ============================================================================
+# First-Sentence Streaming
+# ============================================================================
+
+class FlakyPMS:
+    """PMS stand-in whose first booking attempt fails."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def create_booking(self, guest_details, room_id):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("PMS unavailable")
+        return "CONF123"
+
+
+def _agent(monkeypatch, pms, replies):
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    agent = HotelAgentGraph(pms_client=pms)
+    llm = FakeListChatModel(responses=replies)
+    agent._chain = agent._prompt | llm
+    agent._stream_chain = agent._prompt | llm
+    return agent
+
+
+def _run(agent, state):
+    sent = []
+
+    async def on_first_sentence(sentence):
+        sent.append(sentence)
+
+    config = {"configurable": {"on_first_sentence": on_first_sentence}}
+    result = asyncio.run(agent.app.ainvoke(state, config=config))
+    return result, sent
+
+
+def _ready_to_book_state():
+    return {
+        "messages": [HumanMessage(content="Yes, book it.")],
+        "last_human_idx": 0,
+        "current_step": "presenting_options",
+        "check_in_date": "2030-12-01",
+        "check_out_date": "2030-12-05",
+        "guest_count": 2,
+        "needs_dates": False,
+        "needs_guest_info": False,
+        "selected_room_id": "room_101",
+        "selected_room_name": "Standard Room",
+        "guest_name": "Ada Guest",
+        "guest_email": "ada@example.com",
+        "guest_phone": "+15550100",
+        "ready_to_book": True,
+    }
+
+
+def test_no_early_sentence_when_graph_loops_past_chatbot(monkeypatch):
+    # chatbot -> booking fails -> chatbot -> booking succeeds -> END
+    pms = FlakyPMS()
+    agent = _agent(monkeypatch, pms, ["Booking now. One moment.", "Retrying now. Hold on."])
+
+    result, sent = _run(agent, _ready_to_book_state())
+
+    assert pms.calls == 2
+    assert result["current_step"] == "completed"
+    assert sent == []
+
+
+def test_first_sentence_sent_once_on_final_pass(monkeypatch):
+    agent = _agent(monkeypatch, FlakyPMS(), ["You're all set. Enjoy your stay!"])
+    state = {
+        "messages": [AIMessage(content="Booked!"), HumanMessage(content="Thanks!")],
+        "last_human_idx": 1,
+        "current_step": "completed",
+    }
+
+    result, sent = _run(agent, state)
+
+    assert sent == ["You're all set."]
+    assert result["messages"][-1].content.startswith(sent[0])
+
+
+def test_no_early_sentence_when_chatbot_routes_on(monkeypatch):
+    # Still gathering dates: the pass routes to extract_info, so it isn't final
+    agent = _agent(monkeypatch, FlakyPMS(), ["Happy to help. When would you like to stay?"])
+    state = {"messages": [HumanMessage(content="Hi there")], "last_human_idx": 0}
+    sent = []
+
+    async def on_first_sentence(sentence):
+        sent.append(sentence)
+
+    config = {"configurable": {"on_first_sentence": on_first_sentence}}
+    result = asyncio.run(agent.chatbot_node(state, config))
+
+    assert result["messages"][0].content.startswith("Happy to help.")
+    assert sent == []
+
+
+# ============================================================================
+# Availability Cache
+# ============================================================================
+
+class CountingPMS(FlakyPMS):
+    """PMS stand-in that counts availability lookups."""
+
+    def __init__(self, rooms):
+        super().__init__()
+        self.rooms = rooms
+        self.lookups = 0
+
+    async def check_availability(self, check_in, check_out, guests):
+        self.lookups += 1
+        return list(self.rooms)
+
+
+def _availability_state(**extra):
+    return {
+        "messages": [HumanMessage(content="12/1 to 12/5 for 2 guests")],
+        "check_in_date": "2030-12-01",
+        "check_out_date": "2030-12-05",
+        "guest_count": 2,
+        **extra,
+    }
+
+
+def test_availability_cached_per_session(monkeypatch):
+    pms = CountingPMS([{"id": "room_101", "name": "Standard Room", "price_per_night": 100,
+                        "description": "Cozy", "amenities": ["WiFi"]}])
+    agent = _agent(monkeypatch, pms, ["Done."])
+
+    first = asyncio.run(agent.check_availability_node(_availability_state()))
+    cache = first["availability_cache"]
+    second = asyncio.run(agent.check_availability_node(_availability_state(availability_cache=cache)))
+    asyncio.run(agent.check_availability_node(_availability_state()))  # another session
+
+    assert second["available_rooms"] == first["available_rooms"]
+    assert "availability_cache" not in second
+    assert pms.lookups == 2  # first call and the session without a cache
+
+
+def test_sold_out_availability_not_cached(monkeypatch):
+    pms = CountingPMS([])
+    agent = _agent(monkeypatch, pms, ["Done."])
+
+    result = asyncio.run(agent.check_availability_node(_availability_state()))
+
+    assert result["current_step"] == "no_availability"
+    assert "availability_cache" not in result
+
+
+def test_booking_clears_session_availability(monkeypatch):
+    pms = FlakyPMS()
+    pms.calls = 1  # the next booking succeeds
+    agent = _agent(monkeypatch, pms, ["Done."])
+    state = {**_ready_to_book_state(), "availability_cache": {"k": [0, []]}}
+
+    result = asyncio.run(agent.create_booking_node(state))
+
+    assert result["booking_status"] == "confirmed"
+    assert result["availability_cache"] is None
+
+
+# ============================================================================
+# Response Cache
+# ============================================================================
+
+class RecordingCache:
+    """Response cache stand-in that never hits and records every store."""
+
+    def __init__(self):
+        self.stored = []
+
+    async def get(self, system_prompt, messages):
+        return None
+
+    async def set(self, system_prompt, messages, response):
+        self.stored.append(response)
+
+
+def test_selected_room_replies_are_not_cached(monkeypatch):
+    agent = _agent(monkeypatch, FlakyPMS(), ["Great choice. What's your name?"])
+    agent.response_cache = RecordingCache()
+    state = {
+        "messages": [HumanMessage(content="option 1")],
+        "last_human_idx": 0,
+        "current_step": "room_selected",
+        "selected_room_id": "room_101",
+        "selected_room_name": "Standard Room",
+    }
+
+    result = asyncio.run(agent.chatbot_node(state, {}))
+
+    assert result["messages"][0].content == "Great choice. What's your name?"
+    assert agent.response_cache.stored == []
+
+
+# ============================================================================
+# Guest-Info Fan-Out
+# ============================================================================
+
+def test_fan_out_collects_details_without_booking(monkeypatch):
+    pms = FlakyPMS()
+    agent = _agent(monkeypatch, pms, ["Thanks! Let me check those dates."])
+    agent._guest_info_llm = RunnableLambda(
+        lambda _: GuestInfo(name="Ada Guest", email="ada@example.com", phone="+15550100")
+    )
+    state = {
+        "messages": [HumanMessage(
+            content="12/1 to 12/5 for 2 guests. I'm Ada Guest, ada@example.com, +15550100"
+        )],
+        "last_human_idx": 0,
+    }
+
+    async def run_until_fan_in():
+        # chatbot -> [extract_info, collect_guest_info] -> chatbot; stop there,
+        # since the graph then loops on availability with no room chosen
+        steps = []
+        async for update in agent.app.astream(state, stream_mode="updates"):
+            steps.append(update)
+            if len(steps) > 1 and "chatbot" in update:
+                break
+        return steps
+
+    steps = asyncio.run(run_until_fan_in())
+    nodes = [node for step in steps for node in step]
+
+    assert nodes[0] == "chatbot"
+    assert set(nodes[1:3]) == {"extract_info", "collect_guest_info"}
+    assert nodes[3] == "chatbot"
+    guest_info = next(step["collect_guest_info"] for step in steps if "collect_guest_info" in step)
+    assert guest_info["guest_email"] == "ada@example.com"
+    assert guest_info["ready_to_book"] is False
+    assert pms.calls == 0
@@ -0,0 +1,36 @@
+"""Tests for the WhatsApp input parser."""
+
+import pytest
+
+for _module in ("phonenumbers", "requests", "twilio", "dotenv"):
+    pytest.importorskip(_module)
+
+from whatsapp_handler import WhatsAppInputParser  # noqa: E402
+
+
+# ============================================================================
+# Guest Count
+# ============================================================================
+
+@pytest.mark.parametrize("text, guests", [
+    ("for 2 nights, 3 guests", 3),
+    ("2 adults please", 2),
+    ("a party of 4", 4),
+    ("a table for 5", 5),
+    ("just looking", None),
+])
+def test_extract_guest_count(text, guests):
+    assert WhatsAppInputParser.extract_dates_and_guests(text)["guest_count"] == guests
+
+
+# ============================================================================
+# Dates
+# ============================================================================
+
+@pytest.mark.parametrize("text", ["12/25", "١٢/٢٥"])
+def test_parse_short_date_any_digits(text):
+    assert WhatsAppInputParser.parse_date_from_natural_language(text).endswith("-12-25")
+
+
+def test_parse_date_without_digits():
+    assert WhatsAppInputParser.parse_date_from_natural_language("sometime soon") is None
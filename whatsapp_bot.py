@@ -7,34 +7,158 @@ with the LangGraph state machine.
 """
 
 import os
+import re
+import queue
+import socket
+import atexit
 import logging
 import asyncio
+import time
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
-from typing import Dict, Optional
-from flask import Flask, request, jsonify
+from functools import lru_cache
+from xml.sax.saxutils import escape
+from typing import Dict, Optional, Tuple
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Form, HTTPException, Request
+from fastapi.responses import ORJSONResponse, Response
 from twilio.rest import Client
+import uvicorn
 from twilio.twiml.messaging_response import MessagingResponse
+import ahocorasick
+import httpx
 import redis
-import json
+import redis.asyncio as aioredis
+import msgpack
+import orjson
+import zstandard
 from dotenv import load_dotenv
 
+try:
+    import numpy as np
+    from fastembed import TextEmbedding
+except ImportError:  # Optional: fuzzy matching of canned intents
+    TextEmbedding = None
+
 from langchain_core.messages import HumanMessage, AIMessage
 
 from pms_client import QloAppsClient
-from state_graph import create_hotel_agent, AgentState
+from state_graph import create_hotel_agent, build_room_lookup, AgentState, ResponseCache
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
+# Configure logging: handlers only enqueue records, a background thread does the I/O
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
+# The queue side only merges args into the message; the full format is applied
+# once, on the listener thread (basicConfig would otherwise add its own)
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
 logging.basicConfig(
     level=os.getenv('LOG_LEVEL', 'INFO'),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    handlers=[_queue_handler]
 )
+_log_listener = QueueListener(_log_queue, _log_handler, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
-# Initialize Flask app
-app = Flask(__name__)
+
+async def prewarm():
+    """
+    Open Redis, Groq and PMS connections before the first real message.
+
+    Runs a throwaway graph turn in the "completed" step, which goes straight
+    to END after one chatbot call and is never stored in the response cache.
+    """
+    state = session_manager._create_new_session()
+    state['messages'] = [HumanMessage(content="ping")]
+    state['current_step'] = 'completed'
+    state['needs_dates'] = False
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        session_redis_client.ping(),
+        asyncio.to_thread(redis_client.ping),
+        hotel_agent.app.ainvoke(state),
+        pms_client.warmup(),
+        return_exceptions=True
+    )
+    for name, result in zip(('session redis', 'redis', 'agent graph', 'pms'), results):
+        if isinstance(result, Exception):
+            logger.warning("Prewarm of %s failed: %s", name, result)
+
+    logger.info("Prewarm finished in %.0f ms", (time.perf_counter() - started) * 1000)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prewarm connections on startup and close shared async clients on shutdown."""
+    if os.getenv('WHATSAPP_PREWARM', 'true').lower() == 'true':
+        await prewarm()
+    yield
+    await SHARED_HTTPX.aclose()
+    await session_redis_client.aclose(close_connection_pool=True)
+
+
+# Largest request body accepted; Twilio WhatsApp webhooks are far smaller
+# (message bodies are at most 1600 characters)
+MAX_CONTENT_LENGTH = 16 * 1024
+
+
+class MaxBodySizeMiddleware:
+    """
+    Reject request bodies over `max_body_size` bytes with 413.
+
+    Oversized requests with a Content-Length are refused before the body is
+    read; chunked bodies are counted as they stream and cut off at the cap,
+    so form parsing never buffers more than the limit.
+    """
+
+    def __init__(self, app, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope['headers']).get(b'content-length')
+        if content_length is not None and int(content_length) > self.max_body_size:
+            response = ORJSONResponse(
+                {'status': 'error', 'message': 'Request body too large'},
+                status_code=413
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > self.max_body_size:
+                    raise HTTPException(status_code=413, detail='Request body too large')
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+# Initialize FastAPI app; handlers run as coroutines on the server's event loop
+# and JSON responses are encoded with orjson
+app = FastAPI(
+    title="WhatsApp Hotel Bot",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
+app.add_middleware(MaxBodySizeMiddleware, max_body_size=MAX_CONTENT_LENGTH)
 
 # Initialize Twilio client
 twilio_client = Client(
@@ -42,25 +166,78 @@ twilio_client = Client(
     os.getenv('TWILIO_AUTH_TOKEN')
 )
 
-# Initialize Redis for session management
+# Send the first sentence of each LLM reply as soon as it is generated.
+# Off by default: it costs an extra outbound message per turn and WhatsApp
+# rate-limits business messages.
+STREAM_FIRST_SENTENCE = os.getenv('WHATSAPP_STREAM_FIRST_SENTENCE', 'false').lower() == 'true'
+
+# Upper bound on one webhook turn, so a stuck LLM/PMS call can't hold the request.
+# Kept under Twilio's 15s webhook timeout so the fallback reply still reaches the user
+WEBHOOK_TIMEOUT_SECONDS = 12
+
+# Webhooks processed concurrently per worker; beyond this users get a busy reply
+WEBHOOK_MAX_INFLIGHT = int(os.getenv('WEBHOOK_MAX_INFLIGHT', 64))
+_inflight_webhooks = 0
+
+# Redis connection settings shared by both pools; keepalive probes stop idle
+# pooled sockets from being dropped by NATs/load balancers
+REDIS_POOL_SIZE = int(os.getenv('REDIS_POOL_SIZE', 32))
+_TCP_KEEPALIVE_OPTIONS = {
+    getattr(socket, name): value
+    for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 10), ('TCP_KEEPCNT', 3))
+    if hasattr(socket, name)  # Not every platform exposes all three
+}
+_REDIS_CONNECTION_KWARGS = {
+    'host': os.getenv('REDIS_HOST', 'localhost'),
+    'port': int(os.getenv('REDIS_PORT', 6379)),
+    'db': int(os.getenv('REDIS_DB', 0)),
+    'max_connections': REDIS_POOL_SIZE,
+    'timeout': 5,  # Seconds to wait for a free pooled connection
+    'socket_keepalive': True,
+    'socket_keepalive_options': _TCP_KEEPALIVE_OPTIONS,
+}
+
+# Initialize Redis for the response cache
 redis_client = redis.Redis(
-    host=os.getenv('REDIS_HOST', 'localhost'),
-    port=int(os.getenv('REDIS_PORT', 6379)),
-    db=int(os.getenv('REDIS_DB', 0)),
-    decode_responses=True
+    connection_pool=redis.BlockingConnectionPool(
+        **_REDIS_CONNECTION_KWARGS,
+        decode_responses=True
+    )
+)
+
+# Sessions are stored as compressed binary blobs, so they use a raw-bytes
+# async client shared by all request handlers
+session_redis_client = aioredis.Redis(
+    connection_pool=aioredis.BlockingConnectionPool(
+        **_REDIS_CONNECTION_KWARGS,
+        decode_responses=False
+    )
+)
+
+# Shared HTTP/2 keep-alive pool for Groq and QloApps calls (closed in lifespan)
+SHARED_HTTPX = httpx.AsyncClient(
+    http2=True,
+    timeout=30,
+    limits=httpx.Limits(max_keepalive_connections=50, keepalive_expiry=60)
 )
 
 # Initialize PMS client
 pms_client = QloAppsClient(
     base_url=os.getenv('QLOAPPS_BASE_URL'),
     api_key=os.getenv('QLOAPPS_API_KEY'),
-    mock_mode=os.getenv('PMS_MOCK_MODE', 'true').lower() == 'true'
+    mock_mode=os.getenv('PMS_MOCK_MODE', 'true').lower() == 'true',
+    http_client=SHARED_HTTPX
 )
 
-# Initialize hotel agent
+# Initialize hotel agent with a Redis-backed response cache
 hotel_agent = create_hotel_agent(
     pms_client=pms_client,
-    hotel_name=os.getenv('HOTEL_NAME', 'The Grand Hotel')
+    hotel_name=os.getenv('HOTEL_NAME', 'The Grand Hotel'),
+    response_cache=ResponseCache(
+        redis_client,
+        ttl=int(os.getenv('SESSION_TTL_SECONDS', 3600))
+    ),
+    http_client=SHARED_HTTPX
 )
 
 
@@ -68,21 +245,25 @@ hotel_agent = create_hotel_agent(
 # Session Management
 # ============================================================================
 
+# Upper bound on conversation messages persisted per session
+MAX_SESSION_MESSAGES = 40
+
+
 class SessionManager:
-    """Manage user sessions in Redis."""
+    """Manage user sessions in Redis (msgpack, zstd-compressed)."""
 
-    def __init__(self, redis_client: redis.Redis):
+    def __init__(self, redis_client: aioredis.Redis):
         self.redis = redis_client
         self.session_ttl = int(os.getenv('SESSION_TTL_SECONDS', 3600))  # 1 hour default
 
-    def get_session(self, user_id: str) -> Optional[AgentState]:
+    async def get_session(self, user_id: str) -> Optional[AgentState]:
         """Retrieve user session from Redis."""
         try:
             session_key = f"whatsapp_session:{user_id}"
-            session_data = self.redis.get(session_key)
+            session_data = await self.redis.get(session_key)
 
             if session_data:
-                data = json.loads(session_data)
+                data = msgpack.unpackb(zstandard.decompress(session_data), raw=False)
                 # Convert message dictionaries back to message objects
                 messages = []
                 for msg in data.get('messages', []):
@@ -92,48 +273,68 @@ class SessionManager:
                         messages.append(AIMessage(content=msg['content']))
 
                 data['messages'] = messages
+
+                # The room lookup is derived data and is not stored; rebuild it
+                rooms = data.get('available_rooms')
+                data['room_lookup'] = build_room_lookup(rooms) if rooms else None
                 return data
             else:
                 # Return new session state
                 return self._create_new_session()
 
         except Exception as e:
-            logger.error(f"Error retrieving session for {user_id}: {e}")
+            logger.error("Error retrieving session for %s: %s", user_id, e)
             return self._create_new_session()
 
-    def save_session(self, user_id: str, state: AgentState):
+    async def save_session(self, user_id: str, state: AgentState):
         """Save user session to Redis."""
         try:
             session_key = f"whatsapp_session:{user_id}"
 
-            # Convert message objects to dictionaries for JSON serialization
+            # Messages already folded into history_summary are dropped, and
+            # at most MAX_SESSION_MESSAGES recent ones are kept
+            messages = state['messages']
+            start = max(
+                state.get('history_summarized_count') or 0,
+                len(messages) - MAX_SESSION_MESSAGES
+            )
+
+            # Convert message objects to dictionaries for serialization
             serializable_state = {**state}
+            serializable_state['history_summarized_count'] = 0
+            serializable_state['room_lookup'] = None  # Rebuilt from available_rooms on load
+            last_human_idx = state.get('last_human_idx')
+            serializable_state['last_human_idx'] = (
+                last_human_idx - start
+                if last_human_idx is not None and last_human_idx >= start
+                else None
+            )
             serializable_state['messages'] = [
                 {
                     'type': 'human' if isinstance(msg, HumanMessage) else 'ai',
                     'content': msg.content
                 }
-                for msg in state['messages']
+                for msg in messages[start:]
             ]
 
             # Save to Redis with TTL
-            self.redis.setex(
+            await self.redis.setex(
                 session_key,
                 self.session_ttl,
-                json.dumps(serializable_state)
+                zstandard.compress(msgpack.packb(serializable_state, use_bin_type=True), level=3)
             )
 
         except Exception as e:
-            logger.error(f"Error saving session for {user_id}: {e}")
+            logger.error("Error saving session for %s: %s", user_id, e)
 
-    def clear_session(self, user_id: str):
+    async def clear_session(self, user_id: str):
         """Clear user session."""
         try:
             session_key = f"whatsapp_session:{user_id}"
-            self.redis.delete(session_key)
-            logger.info(f"Session cleared for {user_id}")
+            await self.redis.delete(session_key)
+            logger.info("Session cleared for %s", user_id)
         except Exception as e:
-            logger.error(f"Error clearing session for {user_id}: {e}")
+            logger.error("Error clearing session for %s: %s", user_id, e)
 
     def _create_new_session(self) -> AgentState:
         """Create a new agent state."""
@@ -143,6 +344,8 @@ class SessionManager:
             'check_out_date': None,
             'guest_count': None,
             'available_rooms': None,
+            'availability_cache': None,
+            'room_lookup': None,
             'selected_room_id': None,
             'selected_room_name': None,
             'guest_name': None,
@@ -151,6 +354,9 @@ class SessionManager:
             'special_requests': None,
             'booking_status': None,
             'confirmation_number': None,
+            'history_summary': None,
+            'history_summarized_count': 0,
+            'last_human_idx': None,
             'current_step': None,
             'needs_dates': True,
             'needs_guest_info': True,
@@ -159,7 +365,73 @@ class SessionManager:
 
 
 # Initialize session manager
-session_manager = SessionManager(redis_client)
+session_manager = SessionManager(session_redis_client)
+
+
+# ============================================================================
+# Canned Replies
+# ============================================================================
+
+# Acknowledgements after a completed booking are answered without the LLM
+CANNED_INTENTS = {
+    'thanks': ("thanks", "thank you", "thx", "ty", "thanks a lot", "thank you so much", "great thanks"),
+    'bye': ("bye", "goodbye", "see you", "see ya", "good night"),
+    'yes': ("yes", "yeah", "yep", "sure", "ok", "okay"),
+    'no': ("no", "nope", "no thanks", "no thank you", "that's all", "nothing else"),
+}
+
+CANNED_REPLIES = {
+    'thanks': "You're welcome! 😊 Is there anything else I can help you with?",
+    'bye': "Goodbye! We look forward to welcoming you. 👋",
+    'yes': "Sure! What else can I help you with?",
+    'no': "Thank you for choosing {hotel_name}! Have a wonderful day. 👋",
+}
+
+# Minimum cosine similarity for a fuzzy (embedding) canned-intent match
+CANNED_SIMILARITY_THRESHOLD = 0.9
+
+_CANNED_LOOKUP = {
+    phrase: intent
+    for intent, phrases in CANNED_INTENTS.items()
+    for phrase in phrases
+}
+_CANNED_STRIP_RE = re.compile(r"[^\w\s']+")
+
+
+@lru_cache(maxsize=1)
+def _canned_embeddings():
+    """Load the embedding model and embed the canned phrases (first use only)."""
+    model = TextEmbedding(ResponseCache.EMBEDDING_MODEL)
+    phrases = list(_CANNED_LOOKUP)
+    vectors = np.array(list(model.embed(phrases)))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return model, vectors, [_CANNED_LOOKUP[phrase] for phrase in phrases]
+
+
+def match_canned_intent(text: str) -> Optional[str]:
+    """
+    Classify a short acknowledgement into one of CANNED_INTENTS.
+
+    Exact matches on the normalized text come first; with fastembed
+    installed, short messages fall back to cosine similarity against the
+    canned phrases.
+
+    Args:
+        text: User's message text
+
+    Returns:
+        Intent name, or None if the message is not a canned acknowledgement
+    """
+    normalized = " ".join(_CANNED_STRIP_RE.sub(" ", text.lower()).split())
+    intent = _CANNED_LOOKUP.get(normalized)
+    if intent is not None or TextEmbedding is None or not normalized or len(normalized.split()) > 5:
+        return intent
+
+    model, vectors, intents = _canned_embeddings()
+    vector = next(iter(model.embed([normalized])))
+    scores = vectors @ (vector / np.linalg.norm(vector))
+    best = int(scores.argmax())
+    return intents[best] if scores[best] >= CANNED_SIMILARITY_THRESHOLD else None
 
 
 # ============================================================================
@@ -180,14 +452,14 @@ async def process_message(user_id: str, user_message: str, user_phone: str) -> s
     """
     try:
         # Get or create session
-        state = session_manager.get_session(user_id)
+        state = await session_manager.get_session(user_id)
 
         # Check for special commands
         message_lower = user_message.lower().strip()
 
         if message_lower in ['reset', 'restart', 'start over', 'new booking']:
-            session_manager.clear_session(user_id)
-            state = session_manager.get_session(user_id)
+            await session_manager.clear_session(user_id)
+            state = await session_manager.get_session(user_id)
             return (
                 f"Welcome to {os.getenv('HOTEL_NAME', 'The Grand Hotel')}! 🏨\n\n"
                 f"I'm here to help you make a reservation.\n\n"
@@ -215,21 +487,57 @@ async def process_message(user_id: str, user_message: str, user_phone: str) -> s
             )
 
         if message_lower == 'status':
-            status_msg = self._get_booking_status(state)
-            return status_msg
+            return _get_booking_status(state)
+
+        # Acknowledgements after a completed booking skip the graph and LLM
+        if state.get('current_step') == 'completed':
+            intent = await asyncio.to_thread(match_canned_intent, user_message)
+            if intent is not None:
+                reply = CANNED_REPLIES[intent].format(
+                    hotel_name=os.getenv('HOTEL_NAME', 'The Grand Hotel')
+                )
+                state['messages'].append(HumanMessage(content=user_message))
+                state['last_human_idx'] = len(state['messages']) - 1
+                state['messages'].append(AIMessage(content=reply))
+                await session_manager.save_session(user_id, state)
+                return reply
 
         # Store user's phone if not already stored
         if not state.get('guest_phone'):
             state['guest_phone'] = user_phone
 
         # Add user message to state
-        state['messages'] = state['messages'] + [HumanMessage(content=user_message)]
-
-        # Run through state machine
-        result = await hotel_agent.app.ainvoke(state)
+        state['messages'].append(HumanMessage(content=user_message))
+        state['last_human_idx'] = len(state['messages']) - 1
+
+        # Run through state machine, optionally pushing the first sentence early
+        sent_sentences = []
+        config = None
+        if STREAM_FIRST_SENTENCE:
+            first_sentence_claimed = False
+
+            async def send_first_sentence(sentence: str):
+                # At most one early send per message, however often the graph
+                # passes through the chatbot
+                nonlocal first_sentence_claimed
+                if first_sentence_claimed:
+                    return
+                first_sentence_claimed = True
+
+                await asyncio.to_thread(
+                    twilio_client.messages.create,
+                    body=sentence,
+                    from_=os.getenv('TWILIO_WHATSAPP_NUMBER'),
+                    to=user_phone
+                )
+                sent_sentences.append(sentence)
+
+            config = {"configurable": {"on_first_sentence": send_first_sentence}}
+
+        result = await hotel_agent.app.ainvoke(state, config=config)
 
         # Update session
-        session_manager.save_session(user_id, result)
+        await session_manager.save_session(user_id, result)
 
         # Extract the last AI message
         last_ai_message = ""
@@ -241,13 +549,20 @@ async def process_message(user_id: str, user_message: str, user_phone: str) -> s
         if not last_ai_message:
             last_ai_message = "I'm here to help! Could you please tell me your check-in date?"
 
+        # Don't repeat a sentence that was already delivered
+        for sentence in sent_sentences:
+            if last_ai_message.startswith(sentence):
+                last_ai_message = last_ai_message[len(sentence):].lstrip()
+                if not last_ai_message:
+                    return ""
+
         # Format message for WhatsApp
         formatted_message = format_whatsapp_message(last_ai_message, result)
 
         return formatted_message
 
     except Exception as e:
-        logger.error(f"Error processing message: {e}", exc_info=True)
+        logger.error("Error processing message: %s", e, exc_info=True)
         return (
             "I apologize, but I encountered an error processing your request. "
             "Please try again or type 'reset' to start over."
@@ -256,37 +571,36 @@ async def process_message(user_id: str, user_message: str, user_phone: str) -> s
 
 def _get_booking_status(state: AgentState) -> str:
     """Get current booking status."""
-    status_parts = [f"📊 *Booking Status*\n"]
-
-    if state.get('check_in_date') and state.get('check_out_date'):
-        status_parts.append(
-            f"✅ Dates: {state['check_in_date']} to {state['check_out_date']}"
-        )
-    else:
-        status_parts.append("⏳ Dates: Not provided")
-
-    if state.get('guest_count'):
-        status_parts.append(f"✅ Guests: {state['guest_count']}")
-    else:
-        status_parts.append("⏳ Guests: Not provided")
-
-    if state.get('selected_room_name'):
-        status_parts.append(f"✅ Room: {state['selected_room_name']}")
-    else:
-        status_parts.append("⏳ Room: Not selected")
-
-    if state.get('guest_name'):
-        status_parts.append(f"✅ Guest Name: {state['guest_name']}")
-    else:
-        status_parts.append("⏳ Guest Name: Not provided")
+    status = "\n".join((
+        "📊 *Booking Status*\n",
+        f"✅ Dates: {state['check_in_date']} to {state['check_out_date']}"
+        if state.get('check_in_date') and state.get('check_out_date')
+        else "⏳ Dates: Not provided",
+        f"✅ Guests: {state['guest_count']}"
+        if state.get('guest_count') else "⏳ Guests: Not provided",
+        f"✅ Room: {state['selected_room_name']}"
+        if state.get('selected_room_name') else "⏳ Room: Not selected",
+        f"✅ Guest Name: {state['guest_name']}"
+        if state.get('guest_name') else "⏳ Guest Name: Not provided",
+    ))
 
     if state.get('booking_status') == 'confirmed':
-        status_parts.append(
-            f"\n✅ *Booking Confirmed!*\n"
+        status += (
+            f"\n\n✅ *Booking Confirmed!*\n"
             f"Confirmation: {state.get('confirmation_number')}"
         )
 
-    return "\n".join(status_parts)
+    return status
+
+
+@lru_cache(maxsize=256)
+def _room_name_automaton(room_names: Tuple[str, ...]) -> ahocorasick.Automaton:
+    """Build (and cache) an Aho-Corasick automaton over the offered room names."""
+    automaton = ahocorasick.Automaton()
+    for name in room_names:
+        automaton.add_word(name, name)
+    automaton.make_automaton()
+    return automaton
 
 
 def format_whatsapp_message(message: str, state: AgentState) -> str:
@@ -311,12 +625,14 @@ def format_whatsapp_message(message: str, state: AgentState) -> str:
         formatted = "✅ " + formatted
 
     # Format room lists better
-    if state.get('available_rooms') and len(state['available_rooms']) > 0:
+    room_names = tuple(room['name'] for room in state.get('available_rooms') or () if room['name'])
+    if room_names:
+        automaton = _room_name_automaton(room_names)
         lines = formatted.split('\n')
         formatted_lines = []
         for line in lines:
             # Detect room options and add better formatting
-            if any(room['name'] in line for room in state['available_rooms']):
+            if next(automaton.iter(line), None) is not None:
                 line = "🛏️ " + line
             formatted_lines.append(line)
         formatted = '\n'.join(formatted_lines)
@@ -328,8 +644,16 @@ def format_whatsapp_message(message: str, state: AgentState) -> str:
 # Webhook Endpoints
 # ============================================================================
 
-@app.route('/webhook/whatsapp', methods=['POST'])
-def whatsapp_webhook():
+# TwiML for the common single-message reply, filled without building an SDK
+# MessagingResponse (equivalent to its output)
+_TWIML_MESSAGE = '<?xml version="1.0" encoding="UTF-8"?><Response><Message>{}</Message></Response>'
+_TWIML_EMPTY = '<?xml version="1.0" encoding="UTF-8"?><Response />'
+
+@app.post('/webhook/whatsapp')
+async def whatsapp_webhook(
+    Body: str = Form(''),
+    From: str = Form('')
+):
     """
     Handle incoming WhatsApp messages from Twilio.
 
@@ -337,133 +661,180 @@ def whatsapp_webhook():
     """
     try:
         # Get message details
-        incoming_msg = request.values.get('Body', '').strip()
-        from_number = request.values.get('From', '')
-        to_number = request.values.get('To', '')
+        incoming_msg = Body.strip()
+        from_number = From
 
         # Extract user ID from phone number
         user_id = from_number.replace('whatsapp:', '')
 
-        logger.info(f"Received message from {user_id}: {incoming_msg}")
-
-        # Process message asynchronously
-        response_text = asyncio.run(
-            process_message(user_id, incoming_msg, from_number)
-        )
-
-        # Send response via Twilio
-        resp = MessagingResponse()
-        msg = resp.message()
-        msg.body(response_text)
+        logger.info("Received message from %s: %s", user_id, incoming_msg)
 
-        logger.info(f"Sent response to {user_id}: {response_text[:100]}...")
-
-        return str(resp)
+        global _inflight_webhooks
+        if _inflight_webhooks >= WEBHOOK_MAX_INFLIGHT:
+            # Shed load before touching Redis or Groq
+            logger.warning("Busy (%s in flight), deferring %s", _inflight_webhooks, user_id)
+            response_text = (
+                "We're experiencing high volume right now. "
+                "Please send your message again in a moment."
+            )
+        else:
+            _inflight_webhooks += 1
+            try:
+                response_text = await asyncio.wait_for(
+                    process_message(user_id, incoming_msg, from_number),
+                    timeout=WEBHOOK_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Timed out processing message from %s", user_id)
+                response_text = (
+                    "Sorry, that took longer than expected. "
+                    "Please send your message again."
+                )
+            finally:
+                _inflight_webhooks -= 1
+
+        # Send response via Twilio (empty when it was already streamed out)
+        twiml = _TWIML_MESSAGE.format(escape(response_text)) if response_text else _TWIML_EMPTY
+
+        logger.info("Sent response to %s: %s...", user_id, response_text[:100])
+
+        return Response(content=twiml, media_type='application/xml')
 
     except Exception as e:
-        logger.error(f"Error in webhook: {e}", exc_info=True)
+        logger.error("Error in webhook: %s", e, exc_info=True)
 
         resp = MessagingResponse()
         resp.message(
             "Sorry, I encountered an error. Please try again later or contact support."
         )
-        return str(resp)
+        return Response(content=str(resp), media_type='application/xml')
 
 
-@app.route('/webhook/status', methods=['POST'])
-def status_webhook():
+@app.post('/webhook/status')
+async def status_webhook(
+    MessageSid: Optional[str] = Form(None),
+    MessageStatus: Optional[str] = Form(None)
+):
     """Handle message status updates from Twilio."""
     try:
-        message_sid = request.values.get('MessageSid')
-        message_status = request.values.get('MessageStatus')
-
-        logger.info(f"Message {message_sid} status: {message_status}")
+        logger.info("Message %s status: %s", MessageSid, MessageStatus)
 
-        return jsonify({'status': 'ok'})
+        return {'status': 'ok'}
 
     except Exception as e:
-        logger.error(f"Error in status webhook: {e}")
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+        logger.error("Error in status webhook: %s", e)
+        return ORJSONResponse({'status': 'error', 'message': str(e)}, status_code=500)
 
 
-@app.route('/health', methods=['GET'])
-def health_check():
+# Last Redis ping result as [monotonic time, error message or None]
+HEALTH_PING_TTL_SECONDS = 1.0
+_redis_health = [float('-inf'), None]
+
+
+async def _redis_health_error() -> Optional[str]:
+    """Ping Redis at most once per HEALTH_PING_TTL_SECONDS; return the last error, if any."""
+    now = time.monotonic()
+    if now - _redis_health[0] >= HEALTH_PING_TTL_SECONDS:
+        # Stamp first so concurrent probes reuse this ping instead of starting their own
+        _redis_health[0] = now
+        try:
+            await session_redis_client.ping()
+            _redis_health[1] = None
+        except Exception as e:
+            _redis_health[1] = str(e)
+    return _redis_health[1]
+
+
+@app.get('/health')
+async def health_check():
     """Health check endpoint."""
     try:
-        # Check Redis connection
-        redis_client.ping()
+        # Check Redis connection (cached for HEALTH_PING_TTL_SECONDS)
+        error = await _redis_health_error()
+        if error is not None:
+            raise ConnectionError(error)
 
-        return jsonify({
+        return {
             'status': 'healthy',
             'service': 'whatsapp-hotel-bot',
             'timestamp': datetime.utcnow().isoformat(),
             'redis': 'connected',
             'hotel': os.getenv('HOTEL_NAME', 'The Grand Hotel')
-        })
+        }
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
-        return jsonify({
+        logger.error("Health check failed: %s", e)
+        return ORJSONResponse({
             'status': 'unhealthy',
             'error': str(e)
-        }), 503
+        }, status_code=503)
 
 
-@app.route('/api/send-message', methods=['POST'])
-def send_message_api():
+@app.post('/api/send-message')
+async def send_message_api(request: Request):
     """
     API endpoint to send messages to users.
 
     Useful for notifications, confirmations, etc.
     """
     try:
-        data = request.get_json()
+        try:
+            data = orjson.loads(await request.body())
+        except orjson.JSONDecodeError:
+            data = None
+        if not isinstance(data, dict):
+            return ORJSONResponse({
+                'status': 'error',
+                'message': 'Request body must be a JSON object'
+            }, status_code=400)
+
         to_number = data.get('to')
         message = data.get('message')
 
         if not to_number or not message:
-            return jsonify({
+            return ORJSONResponse({
                 'status': 'error',
                 'message': 'Missing required fields: to, message'
-            }), 400
+            }, status_code=400)
 
         # Ensure WhatsApp format
         if not to_number.startswith('whatsapp:'):
             to_number = f"whatsapp:{to_number}"
 
-        # Send via Twilio
-        twilio_message = twilio_client.messages.create(
+        # Send via Twilio (blocking REST client, so off the event loop)
+        twilio_message = await asyncio.to_thread(
+            twilio_client.messages.create,
             body=message,
             from_=os.getenv('TWILIO_WHATSAPP_NUMBER'),
             to=to_number
         )
 
-        return jsonify({
+        return {
             'status': 'success',
             'message_sid': twilio_message.sid
-        })
+        }
 
     except Exception as e:
-        logger.error(f"Error sending message: {e}")
-        return jsonify({
+        logger.error("Error sending message: %s", e)
+        return ORJSONResponse({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }, status_code=500)
 
 
-@app.route('/api/clear-session/<user_id>', methods=['DELETE'])
-def clear_user_session(user_id: str):
+@app.delete('/api/clear-session/{user_id}')
+async def clear_user_session(user_id: str):
     """Clear a user's session (admin endpoint)."""
     try:
-        session_manager.clear_session(user_id)
-        return jsonify({
+        await session_manager.clear_session(user_id)
+        return {
             'status': 'success',
             'message': f'Session cleared for {user_id}'
-        })
+        }
     except Exception as e:
-        return jsonify({
+        return ORJSONResponse({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }, status_code=500)
 
 
 # ============================================================================
@@ -471,7 +842,7 @@ def clear_user_session(user_id: str):
 # ============================================================================
 
 def main():
-    """Run the Flask app."""
+    """Run the app under uvicorn."""
 
     # Validate environment variables
     required_vars = [
@@ -484,22 +855,24 @@ def main():
     missing_vars = [var for var in required_vars if not os.getenv(var)]
 
     if missing_vars:
-        logger.error(f"Missing required environment variables: {', '.join(missing_vars)}")
+        logger.error("Missing required environment variables: %s", ', '.join(missing_vars))
         logger.error("Please check your .env file")
         return
 
     logger.info("Starting WhatsApp Hotel Bot")
-    logger.info(f"Hotel: {os.getenv('HOTEL_NAME', 'The Grand Hotel')}")
-    logger.info(f"WhatsApp Number: {os.getenv('TWILIO_WHATSAPP_NUMBER')}")
+    logger.info("Hotel: %s", os.getenv('HOTEL_NAME', 'The Grand Hotel'))
+    logger.info("WhatsApp Number: %s", os.getenv('TWILIO_WHATSAPP_NUMBER'))
 
-    # Run Flask app
+    # Run under uvicorn; loop='auto' picks uvloop when it is installed
     port = int(os.getenv('WHATSAPP_BOT_PORT', 5000))
-    debug = os.getenv('FLASK_DEBUG', 'false').lower() == 'true'
+    workers = int(os.getenv('WHATSAPP_BOT_WORKERS', 2))
 
-    app.run(
+    uvicorn.run(
+        'whatsapp_bot:app',
         host='0.0.0.0',
         port=port,
-        debug=debug
+        workers=workers,
+        loop='auto'
     )
 
 
@@ -8,34 +8,83 @@ and advanced WhatsApp features.
 import os
 import logging
 import re
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 import phonenumbers
+import requests
+from requests.adapters import HTTPAdapter
 from twilio.rest import Client
+from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
+# Configuration is read once at import (after .env is loaded), not per message
+load_dotenv()
+HOTEL_NAME = os.getenv('HOTEL_NAME', 'The Grand Hotel')
+TWILIO_FROM = os.getenv('TWILIO_WHATSAPP_NUMBER')
+TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
+
+# Keep-alive session for media downloads, shared by all handler instances
+_HTTP = requests.Session()
+_HTTP.mount('https://', HTTPAdapter(pool_connections=20, pool_maxsize=50))
+
+# Patterns are compiled once at import; the parsers run on every incoming message
+# Any Unicode digit, as \d in the date patterns below (e.g. Arabic-Indic "١٢/٢٥")
+_DIGIT = re.compile(r'\d')
+_DATE_FULL = re.compile(r'(\d{4}[-/]\d{2}[-/]\d{2})')
+_DATE_SHORT = re.compile(r'(\d{1,2}[-/]\d{1,2})')
+_DATES_ISO = re.compile(r'(\d{4}-\d{2}-\d{2})')
+# Guest-count phrasings in priority order: an explicit guest noun beats a bare
+# "for N", which may be a night count ("for 2 nights, 3 guests")
+_GUESTS = (
+    re.compile(r'(\d+)\s*(?:guests?|people|persons?|adults?|pax)|party\s*of\s*(\d+)'),
+    re.compile(r'for\s*(\d+)'),
+)
+# Email/phone repeats are bounded (RFC 5321 local/domain lengths, E.164 digits)
+# so crafted input can't drive long backtracking runs
+_EMAIL = re.compile(
+    r'\b[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9.-]{1,253}\.[A-Za-z]{2,24}\b',
+    re.ASCII
+)
+_PHONE = re.compile(r'[+\d][\d\s\-()]{7,20}\d', re.ASCII)
+_EMAIL_VALID = re.compile(
+    r'^[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9.-]{1,253}\.[A-Za-z]{2,24}$',
+    re.ASCII
+)
+
 
 # ============================================================================
 # Message Formatters
 # ============================================================================
 
+# Static messages that only depend on configuration are rendered once
+_GREETING = (
+    f"🏨 *Welcome to {HOTEL_NAME}!*\n\n"
+    f"I'm your AI assistant, here to help you book the perfect room.\n\n"
+    f"📅 To get started, please provide:\n"
+    f"• Check-in date (e.g., 2024-12-15)\n"
+    f"• Check-out date (e.g., 2024-12-20)\n"
+    f"• Number of guests\n\n"
+    f"💡 You can also type 'help' anytime for assistance!"
+)
+
+
+# Room list pieces; format_room_list fills one template per room
+_ROOM_LIST_HEADER = "🏨 *Available Rooms:*\n"
+_ROOM_TMPL = "\n*{i}. {name}* 💰 ${price}/night\n   {desc}\n   ✨ {amen}"
+_ROOM_TOTAL_TMPL = "\n   📊 Total: ${total}"
+_ROOM_LIST_FOOTER = "\n\n💬 To select a room, just reply with the room name or number!"
+
+
 class WhatsAppMessageFormatter:
     """Format messages for WhatsApp with proper markdown and structure."""
 
     @staticmethod
     def format_greeting() -> str:
         """Format initial greeting message."""
-        hotel_name = os.getenv('HOTEL_NAME', 'The Grand Hotel')
-        return (
-            f"🏨 *Welcome to {hotel_name}!*\n\n"
-            f"I'm your AI assistant, here to help you book the perfect room.\n\n"
-            f"📅 To get started, please provide:\n"
-            f"• Check-in date (e.g., 2024-12-15)\n"
-            f"• Check-out date (e.g., 2024-12-20)\n"
-            f"• Number of guests\n\n"
-            f"💡 You can also type 'help' anytime for assistance!"
-        )
+        return _GREETING
 
     @staticmethod
     def format_room_list(rooms: List[Dict]) -> str:
@@ -51,28 +100,20 @@ class WhatsAppMessageFormatter:
         if not rooms:
             return "Sorry, no rooms are available for your selected dates."
 
-        message_parts = ["🏨 *Available Rooms:*\n"]
-
-        for i, room in enumerate(rooms, 1):
-            amenities = room.get('amenities', [])
-            amenities_str = ", ".join(amenities[:4])  # Limit to first 4 amenities
-
-            room_text = (
-                f"\n*{i}. {room['name']}* 💰 ${room['price_per_night']}/night\n"
-                f"   {room['description']}\n"
-                f"   ✨ {amenities_str}"
-            )
-
-            if room.get('total_price'):
-                room_text += f"\n   📊 Total: ${room['total_price']}"
-
-            message_parts.append(room_text)
-
-        message_parts.append(
-            f"\n\n💬 To select a room, just reply with the room name or number!"
+        room_tmpl = _ROOM_TMPL.format_map
+        total_tmpl = _ROOM_TOTAL_TMPL.format_map
+        room_lines = "\n".join(
+            room_tmpl({
+                'i': i,
+                'name': room['name'],
+                'price': room['price_per_night'],
+                'desc': room['description'],
+                'amen': ", ".join(room.get('amenities', [])[:4]),  # Limit to first 4 amenities
+            }) + (total_tmpl({'total': total}) if (total := room.get('total_price')) else "")
+            for i, room in enumerate(rooms, 1)
         )
 
-        return "\n".join(message_parts)
+        return f"{_ROOM_LIST_HEADER}\n{room_lines}\n{_ROOM_LIST_FOOTER}"
 
     @staticmethod
     def format_booking_confirmation(
@@ -84,20 +125,17 @@ class WhatsAppMessageFormatter:
         guest_email: str
     ) -> str:
         """Format booking confirmation message."""
-        hotel_name = os.getenv('HOTEL_NAME', 'The Grand Hotel')
 
         # Calculate nights
         try:
-            check_in_date = datetime.strptime(check_in, '%Y-%m-%d')
-            check_out_date = datetime.strptime(check_out, '%Y-%m-%d')
-            nights = (check_out_date - check_in_date).days
-        except:
+            nights = (date.fromisoformat(check_out) - date.fromisoformat(check_in)).days
+        except (TypeError, ValueError):
             nights = "N/A"
 
         return (
             f"✅ *Booking Confirmed!*\n\n"
             f"🎫 *Confirmation:* {confirmation_number}\n"
-            f"🏨 *Hotel:* {hotel_name}\n"
+            f"🏨 *Hotel:* {HOTEL_NAME}\n"
             f"🛏️ *Room:* {room_name}\n"
             f"👥 *Guests:* {guest_count}\n"
             f"📅 *Check-in:* {check_in}\n"
@@ -143,11 +181,60 @@ class WhatsAppMessageFormatter:
 # Date and Input Parsing
 # ============================================================================
 
+@dataclass(frozen=True)
+class ParsedInput:
+    """A user message with its lowercased form, computed once and shared by the parsers."""
+
+    # Declared by hand: dataclass(slots=True) needs Python 3.10
+    __slots__ = ('raw', 'lower')
+
+    raw: str
+    lower: str
+
+    @classmethod
+    def from_text(cls, text: Union[str, 'ParsedInput']) -> 'ParsedInput':
+        """Wrap raw text (a ParsedInput is returned unchanged)."""
+        if isinstance(text, cls):
+            return text
+        return cls(raw=text, lower=text.lower())
+
+
+@lru_cache(maxsize=256)
+def _room_matchers(
+    rooms: Tuple[Tuple[str, str], ...]
+) -> Tuple[Tuple[Tuple[str, str], ...], Optional[re.Pattern], Dict[str, str]]:
+    """
+    Build the lookups used by parse_room_selection for a set of rooms.
+
+    Args:
+        rooms: Tuple of (room_id, room_name) pairs
+
+    Returns:
+        Tuple of ((room_id, lowered_name) pairs, alternation over the
+        significant name words, word -> room_id of the first room using it)
+    """
+    lowered = tuple((room_id, name.lower()) for room_id, name in rooms)
+
+    room_by_word = {}
+    for room_id, name_lower in lowered:
+        for word in name_lower.split():
+            if len(word) > 3:
+                room_by_word.setdefault(word, room_id)
+
+    partial_re = None
+    if room_by_word:
+        # Longest words first so overlapping alternatives prefer the fuller word
+        words = sorted(room_by_word, key=len, reverse=True)
+        partial_re = re.compile('|'.join(re.escape(word) for word in words))
+
+    return lowered, partial_re, room_by_word
+
+
 class WhatsAppInputParser:
     """Parse user inputs from WhatsApp messages."""
 
     @staticmethod
-    def parse_date_from_natural_language(text: str) -> Optional[str]:
+    def parse_date_from_natural_language(text: Union[str, ParsedInput]) -> Optional[str]:
         """
         Parse date from natural language.
 
@@ -157,31 +244,32 @@ class WhatsAppInputParser:
         - "December 15" -> 2024-12-15
         - "12/15" -> 2024-12-15
         """
-        text_lower = text.lower().strip()
+        parsed = ParsedInput.from_text(text)
+        text, text_lower = parsed.raw, parsed.lower.strip()
         today = datetime.now()
 
         # Handle relative dates
         if 'tomorrow' in text_lower:
-            date = today + timedelta(days=1)
-            return date.strftime('%Y-%m-%d')
+            return (today + timedelta(days=1)).strftime('%Y-%m-%d')
 
         if 'today' in text_lower:
             return today.strftime('%Y-%m-%d')
 
         if 'next week' in text_lower:
-            date = today + timedelta(weeks=1)
-            return date.strftime('%Y-%m-%d')
+            return (today + timedelta(weeks=1)).strftime('%Y-%m-%d')
+
+        # Both remaining formats need digits; most chat messages have none
+        if not _DIGIT.search(text):
+            return None
 
         # Try to find YYYY-MM-DD format
-        date_pattern = r'(\d{4}[-/]\d{2}[-/]\d{2})'
-        match = re.search(date_pattern, text)
+        match = _DATE_FULL.search(text)
         if match:
             date_str = match.group(1).replace('/', '-')
             return date_str
 
         # Try MM/DD or MM-DD format
-        short_date_pattern = r'(\d{1,2}[-/]\d{1,2})'
-        match = re.search(short_date_pattern, text)
+        match = _DATE_SHORT.search(text)
         if match:
             try:
                 date_parts = match.group(1).replace('/', '-').split('-')
@@ -201,13 +289,14 @@ class WhatsAppInputParser:
         return None
 
     @staticmethod
-    def extract_dates_and_guests(text: str) -> Dict[str, Optional[str]]:
+    def extract_dates_and_guests(text: Union[str, ParsedInput]) -> Dict[str, Optional[str]]:
         """
         Extract booking information from a message.
 
         Returns:
             Dictionary with check_in, check_out, and guest_count
         """
+        parsed = ParsedInput.from_text(text)
         result = {
             'check_in': None,
             'check_out': None,
@@ -215,8 +304,7 @@ class WhatsAppInputParser:
         }
 
         # Extract dates
-        date_pattern = r'(\d{4}-\d{2}-\d{2})'
-        dates = re.findall(date_pattern, text)
+        dates = _DATES_ISO.findall(parsed.raw)
 
         if len(dates) >= 2:
             result['check_in'] = dates[0]
@@ -225,51 +313,51 @@ class WhatsAppInputParser:
             result['check_in'] = dates[0]
 
         # Extract guest count
-        guest_patterns = [
-            r'(\d+)\s*(?:guests?|people|persons?)',
-            r'for\s*(\d+)',
-            r'party\s*of\s*(\d+)',
-            r'(\d+)\s*(?:adults?|pax)'
-        ]
-
-        for pattern in guest_patterns:
-            match = re.search(pattern, text.lower())
+        for pattern in _GUESTS:
+            match = pattern.search(parsed.lower)
             if match:
-                result['guest_count'] = int(match.group(1))
+                result['guest_count'] = int(next(g for g in match.groups() if g))
                 break
 
         return result
 
     @staticmethod
-    def parse_room_selection(text: str, available_rooms: List[Dict]) -> Optional[str]:
+    def parse_room_selection(
+        text: Union[str, ParsedInput],
+        available_rooms: List[Dict]
+    ) -> Optional[str]:
         """
         Parse room selection from user message.
 
         Args:
-            text: User's message
+            text: User's message (raw or already wrapped in ParsedInput)
             available_rooms: List of available rooms
 
         Returns:
             Room ID if match found, None otherwise
         """
-        text_lower = text.lower().strip()
+        text_lower = ParsedInput.from_text(text).lower.strip()
 
         # Check for numeric selection (1, 2, 3, etc.)
-        if text_lower.isdigit():
+        if text_lower.isascii() and text_lower.isdigit():
             index = int(text_lower) - 1
             if 0 <= index < len(available_rooms):
                 return available_rooms[index]['id']
 
+        lowered, partial_re, room_by_word = _room_matchers(
+            tuple((room['id'], room['name']) for room in available_rooms)
+        )
+
         # Check for room name match
-        for room in available_rooms:
-            if room['name'].lower() in text_lower:
-                return room['id']
+        for room_id, name_lower in lowered:
+            if name_lower in text_lower:
+                return room_id
 
-        # Check for partial matches
-        for room in available_rooms:
-            room_words = room['name'].lower().split()
-            if any(word in text_lower for word in room_words if len(word) > 3):
-                return room['id']
+        # Check for partial matches (one pass over the text for all room words)
+        if partial_re is not None:
+            match = partial_re.search(text_lower)
+            if match:
+                return room_by_word[match.group(0)]
 
         return None
 
@@ -288,26 +376,17 @@ class WhatsAppInputParser:
         }
 
         # Extract email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, text)
+        email_match = _EMAIL.search(text)
         if email_match:
             result['email'] = email_match.group(0)
 
         # Extract phone number (basic pattern)
-        phone_pattern = r'[\+\d][\d\s\-\(\)]{7,}\d'
-        phone_match = re.search(phone_pattern, text)
+        phone_match = _PHONE.search(text)
         if phone_match:
             phone = phone_match.group(0)
-            # Try to parse and format
-            try:
-                parsed = phonenumbers.parse(phone, None)
-                if phonenumbers.is_valid_number(parsed):
-                    result['phone'] = phonenumbers.format_number(
-                        parsed,
-                        phonenumbers.PhoneNumberFormat.E164
-                    )
-            except:
-                result['phone'] = phone
+            # Try to parse and format; keep the raw match if it can't be parsed
+            parseable, formatted = _parse_phone(phone)
+            result['phone'] = formatted if parseable else phone
 
         # Name extraction (simple heuristic - capitalize words)
         # Remove email and phone from text first
@@ -354,21 +433,19 @@ class WhatsAppMediaHandler:
         try:
             # Fetch media from Twilio
             media = self.twilio_client.api.v2010.accounts(
-                os.getenv('TWILIO_ACCOUNT_SID')
+                TWILIO_ACCOUNT_SID
             ).messages(media_sid).media(0).fetch()
 
-            # Download the media content
-            import requests
-            response = requests.get(media.uri)
+            # Download the media content over the pooled session
+            with _HTTP.get(media.uri, stream=True, timeout=10) as response:
+                if response.status_code == 200:
+                    return response.content
 
-            if response.status_code == 200:
-                return response.content
-            else:
-                logger.error(f"Failed to download media: {response.status_code}")
+                logger.error("Failed to download media: %s", response.status_code)
                 return None
 
         except Exception as e:
-            logger.error(f"Error downloading media: {e}")
+            logger.error("Error downloading media: %s", e)
             return None
 
     def send_image(self, to_number: str, image_url: str, caption: str = ""):
@@ -382,16 +459,16 @@ class WhatsAppMediaHandler:
         """
         try:
             message = self.twilio_client.messages.create(
-                from_=os.getenv('TWILIO_WHATSAPP_NUMBER'),
+                from_=TWILIO_FROM,
                 to=to_number,
                 body=caption,
                 media_url=[image_url]
             )
-            logger.info(f"Sent image to {to_number}: {message.sid}")
+            logger.info("Sent image to %s: %s", to_number, message.sid)
             return message.sid
 
         except Exception as e:
-            logger.error(f"Error sending image: {e}")
+            logger.error("Error sending image: %s", e)
             return None
 
 
@@ -399,6 +476,28 @@ class WhatsAppMediaHandler:
 # Quick Reply Templates
 # ============================================================================
 
+_AMENITIES_INFO = (
+    f"🏨 *{HOTEL_NAME} - Amenities*\n\n"
+    f"🌟 *Hotel Features:*\n"
+    f"• 24/7 Front Desk\n"
+    f"• Free WiFi throughout\n"
+    f"• Swimming Pool & Spa\n"
+    f"• Fitness Center\n"
+    f"• Restaurant & Bar\n"
+    f"• Room Service\n"
+    f"• Free Parking\n"
+    f"• Airport Shuttle\n\n"
+    f"🛏️ *Room Features:*\n"
+    f"• Air Conditioning\n"
+    f"• Flat-screen TV\n"
+    f"• Coffee/Tea Maker\n"
+    f"• Mini Bar\n"
+    f"• Safe\n"
+    f"• Hairdryer\n\n"
+    f"Ready to book? Let me know your dates!"
+)
+
+
 class QuickReplyTemplates:
     """Pre-defined quick reply templates for common scenarios."""
 
@@ -433,27 +532,7 @@ class QuickReplyTemplates:
     @staticmethod
     def get_amenities_info() -> str:
         """Get hotel amenities information."""
-        hotel_name = os.getenv('HOTEL_NAME', 'The Grand Hotel')
-        return (
-            f"🏨 *{hotel_name} - Amenities*\n\n"
-            f"🌟 *Hotel Features:*\n"
-            f"• 24/7 Front Desk\n"
-            f"• Free WiFi throughout\n"
-            f"• Swimming Pool & Spa\n"
-            f"• Fitness Center\n"
-            f"• Restaurant & Bar\n"
-            f"• Room Service\n"
-            f"• Free Parking\n"
-            f"• Airport Shuttle\n\n"
-            f"🛏️ *Room Features:*\n"
-            f"• Air Conditioning\n"
-            f"• Flat-screen TV\n"
-            f"• Coffee/Tea Maker\n"
-            f"• Mini Bar\n"
-            f"• Safe\n"
-            f"• Hairdryer\n\n"
-            f"Ready to book? Let me know your dates!"
-        )
+        return _AMENITIES_INFO
 
     @staticmethod
     def get_cancellation_policy() -> str:
@@ -473,30 +552,42 @@ class QuickReplyTemplates:
 # Validation Utilities
 # ============================================================================
 
-def validate_phone_number(phone: str) -> Tuple[bool, Optional[str]]:
+@lru_cache(maxsize=2048)
+def _parse_phone(phone: str) -> Tuple[bool, Optional[str]]:
     """
-    Validate and format phone number.
+    Parse a phone number once per distinct input.
 
     Returns:
-        Tuple of (is_valid, formatted_number)
+        Tuple of (parseable, E.164 number if valid else None)
     """
     try:
         parsed = phonenumbers.parse(phone, None)
-        if phonenumbers.is_valid_number(parsed):
-            formatted = phonenumbers.format_number(
-                parsed,
-                phonenumbers.PhoneNumberFormat.E164
-            )
-            return True, formatted
-        return False, None
-    except:
+    except phonenumbers.NumberParseException:
         return False, None
 
+    if not phonenumbers.is_valid_number(parsed):
+        return True, None
+    return True, phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+
+
+def validate_phone_number(phone: str) -> Tuple[bool, Optional[str]]:
+    """
+    Validate and format phone number.
+
+    Returns:
+        Tuple of (is_valid, formatted_number)
+    """
+    formatted = _parse_phone(phone)[1]
+    return formatted is not None, formatted
+
 
 def validate_email(email: str) -> bool:
     """Validate email format."""
-    email_pattern = r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}$'
-    return bool(re.match(email_pattern, email))
+    return bool(_EMAIL_VALID.match(email))
+
+
+# Longest user message passed on to the agent
+MAX_MESSAGE_LENGTH = 1000
 
 
 def sanitize_message(message: str) -> str:
@@ -509,12 +600,14 @@ def sanitize_message(message: str) -> str:
     Returns:
         Sanitized message
     """
+    # Common case: short and already trimmed, so the message is returned as is
+    if len(message) <= MAX_MESSAGE_LENGTH and (
+        not message or not (message[0].isspace() or message[-1].isspace())
+    ):
+        return message
+
     # Remove potential injection attempts
     sanitized = message.strip()
 
     # Limit length
-    max_length = 1000
-    if len(sanitized) > max_length:
-        sanitized = sanitized[:max_length]
-
-    return sanitized
+    return sanitized[:MAX_MESSAGE_LENGTH]